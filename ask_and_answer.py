@@ -26,8 +26,10 @@ import logging
 import os
 import inspect
 import json
+import argparse
 
 from farseer.exec.exc import columntitles
+from farseer.graphdb.graphdb import get_graph
 
 port = 8080
 
@@ -190,5 +192,11 @@ def internal_server_error(e):
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the Farseer web application.')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='rebuild the domainmodel from the database instead of loading its snapshot, e.g. after editing the database')
+    args = parser.parse_args()
     os.environ['CUDA_VISIBLE_DEVICES'] = '-1' # On machines with GPU, loading of all CUDA DLL's takes a long time and we don't need them, so skip.
+    if args.rebuild:
+        get_graph(rebuild=True)
     app.run(host='0.0.0.0', port=port, debug=True)
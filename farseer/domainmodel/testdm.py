@@ -178,20 +178,20 @@ gezondheidszorg = Constant(name='gezondheidszorg', codomain=activiteiten)
 gedeelddoor = Operator(name='(/)', domain=Application(cartesian_product,[getal, getal]), codomain=getal)
 
 # domain model
-domainmodel = [persoon, adres, gemeente, provincie, baan, bedrijf, getal, datum, tekst, gemeentenamen, provincienamen, straatnamen, geslachten, huisnummers,
+domainmodel = (persoon, adres, gemeente, provincie, baan, bedrijf, getal, datum, tekst, gemeentenamen, provincienamen, straatnamen, geslachten, huisnummers,
       namen, beroepen, activiteiten, woontop, ligtin, werknemer, werkgever, gevestigdop, leeftijd, inkomen, gewicht, lengte, geslacht, geboortedatum, naam, huisnummer, straatnaam, gemeentenaam,
-      salaris, functie, omzet, economischehoofdactiviteit, man, vrouw, gedeelddoor, persoonid, adresid, gemeenteid, provincieid, baanid, bedrijfid]
+      salaris, functie, omzet, economischehoofdactiviteit, man, vrouw, gedeelddoor, persoonid, adresid, gemeenteid, provincieid, baanid, bedrijfid,
 
 #### persoonadresid, adresgemeenteid, bedrijfid, baanpersoonid, baanbedrijfid, bedrijfadresid
 
-domainmodel.extend([denhaag, delft, rotterdam, utrecht,
+      denhaag, delft, rotterdam, utrecht,
       leiden, zuidholland, kolonel, wethouder, griffier, seismoloog, watermanager, oogarts, industrie, onderwijs, bouwnijverheid, openbaarbestuur,
       zakelijkedienstverlening, gezondheidszorg, tjalling, maartje, emma, john, hans, mirjam, petra, karsten, thor, kirsten,
       marcel, irene, robert, ellen, chris, rachel, jacob, johanna, david, esther, diana, mathilde, jeroen, henriette, sander,
       harry, barry, alex, samantha, bob, richard, jack, jill, sandra, peter, sabine, ronald, linda, tim, tom, selena, gerard,
       aart, marjan, erik, arnout, thea, jacobiene, ronaldo, gaby, aartvanderleeuwlaan, prinsmauritsstraat, westlandseweg,
       meppelerweg, lutherseburgwal, coolsingel, blaak, amsterdamsestraatweg, europalaan, josephhaydnlaan, rapenburg, wittesingel,
-      haagweg, klikspaanweg])
+      haagweg, klikspaanweg)
 
 
 # datasets
@@ -2,14 +2,48 @@
 This module contains utility functions for various conversions between data
 """
 
-from farseer.kind.knd import Kind, Measure, Phenomenon, ObjectType, Variable, ObjectTypeRelation, DatasetDesign, Quantity, Constant, Operator, Level, Unit, Representation, CodeList, MeasureRepresentationMapping, ObjectTypeInclusion, DatasetDescription, PhenomenonMeasureMapping
+from farseer.kind.knd import Kind, Measure, Phenomenon, ObjectType, Variable, ObjectTypeRelation, DatasetDesign, Quantity, Constant, Operator, Level, Unit, Representation, CodeList, MeasureRepresentationMapping, ObjectTypeInclusion, DatasetDescription, PhenomenonMeasureMapping, one
 import json
 import pprint
 from farseer.domainmodel.dm import dm
 import time
 from neo4j.graph import Path
-from farseer.graphdb.dbconfig import one_type, one_name, types, elements
+from farseer.graphdb.dbconfig import one_type, one_name, TYPES, ELEMENTS
 from neo4j.work.result import Result
+import logging
+try:
+    #orjson is optional; it parses considerably faster than the json module
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+log = logging.getLogger(__name__)
+
+"""
+Constructors for Kind objects rebuilt from the database by GraphDB.dict_to_kind() or from JSON by json_to_kind(), keyed by sort.
+Types are constructed from their name and kind dictionary, elements from their name, domain, codomain and kind dictionary.
+Sorts DatasetDesign and Operator are not implemented yet.
+"""
+TYPE_CONSTRUCTORS = {
+    "ObjectType": lambda name, kind_dict: ObjectType(name=name, altname=kind_dict.get('altname')),
+    "Phenomenon": lambda name, kind_dict: Phenomenon(name=name),
+    "Quantity": lambda name, kind_dict: Quantity(name=name),
+    "Measure": lambda name, kind_dict: Measure(name=name),
+    "Unit": lambda name, kind_dict: Unit(name=name),
+    "Representation": lambda name, kind_dict: Representation(name=name),
+    "One": lambda name, kind_dict: one,
+    "Level": lambda name, kind_dict: Level(name=name),
+    "CodeList": lambda name, kind_dict: CodeList(name=name)
+}
+ELEMENT_CONSTRUCTORS = {
+    "ObjectTypeInclusion": lambda name, domain, codomain, kind_dict: ObjectTypeInclusion(name=name, domain=domain, codomain=codomain),
+    "DatasetDescription": lambda name, domain, codomain, kind_dict: DatasetDescription(name=name, domain=domain, codomain=codomain),
+    "PhenomenonMeasureMapping": lambda name, domain, codomain, kind_dict: PhenomenonMeasureMapping(name=name, domain=domain, codomain=codomain),
+    "MeasureRepresentationMapping": lambda name, domain, codomain, kind_dict: MeasureRepresentationMapping(name=name, domain=domain, codomain=codomain),
+    "ObjectTypeRelation": lambda name, domain, codomain, kind_dict: ObjectTypeRelation(name=name, domain=domain, codomain=codomain),
+    "Variable": lambda name, domain, codomain, kind_dict: Variable(name=name, domain=domain, codomain=codomain, article=kind_dict.get('article')),
+    "Constant": lambda name, domain, codomain, kind_dict: Constant(name=name, codomain=codomain, code=kind_dict.get('code'))
+}
 
 
 def dm_to_dmdict(domainmodel):
@@ -29,12 +63,12 @@ def kind_to_dict(kind: Kind) -> dict:
     """
 
     name = kind.name
-    sort = kind.__class__.__name__
+    sort = kind.dbsort
     kind_dict = {"kind": sort, "name": name}
 
-    if sort in types:
+    if sort in TYPES:
         kind_dict = kind_dict
-    elif sort in elements:
+    elif sort in ELEMENTS:
         codomain = kind_to_dict(kind.codomain)
         if sort != "Constant":
             domain = kind_to_dict(kind.domain)
@@ -64,60 +98,31 @@ def json_to_kind(jsonstring: str) -> Kind:
         Kind: Kind object
     """
     jsonstring = remove_unicode_chars(jsonstring)
-    kind_dict = json.loads(jsonstring)
+    return kind_dict_to_kind(json_loads(jsonstring))
+
+def kind_dict_to_kind(kind_dict: dict) -> Kind:
+    """Function for building kind from dictionary as returned by kind_to_dict().
+    Domain and codomain are nested dictionaries, which are built recursively without encoding them to JSON again.
+
+    Args:
+        kind_dict (dict): Information needed to build kind object
+
+    Returns:
+        Kind: Kind object
+    """
     sort = kind_dict['kind']
     name = kind_dict['name']
     kind = None
-    if sort in types:
-        if sort == "ObjectType":
-            kind = ObjectType(name=name)
-        elif sort == "Phenomenom":
-            kind = Phenomenon(name=name)
-        elif sort == "Quantity":
-            kind = Quantity(name=name)
-        elif sort == "Measure":
-            kind = Measure(name=name)
-        elif sort == "Unit":
-            kind = Unit(name=name)
-        elif sort == "Representation":
-            kind = Representation(name=name)
-        elif sort == "1":
-            kind = Variable(name=name)
-        elif sort == "Level":
-            kind = Level(name=name)
-        elif sort == "Codelist":
-            kind = CodeList(name=name)
-        if sort == "Phenomenon":
-            kind = Phenomenon(name=name)           
-
-    elif sort in elements:
-        
-        domain_jsons = str(kind_dict['domain']).replace("'",'"')
-        domain = json_to_kind(domain_jsons)
-        
-        codomain_jsons = str(kind_dict['domain']).replace("'", '"')
-        codomain = json_to_kind(codomain_jsons)
-
-        if sort == "DatasetDesign":
-            print("Kind DatasetDesign not implemented yet")
-            #kind = DatasetDesign(name=name, domain=domain, codomain=codomain)
-        elif sort == "ObjectTypeInclusion":
-            kind = ObjectTypeInclusion(name=name, domain=domain, codomain=codomain)
-        elif sort == "DatasetDescription":
-            kind = DatasetDescription(name=name, domain=domain, codomain=codomain)
-        elif sort == "PhenomenonMeasureMapping":
-            kind = PhenomenonMeasureMapping(name=name, domain=domain, codomain=codomain)
-        elif sort == "MeasureRepresentationMapping":
-            kind = MeasureRepresentationMapping(name=name, domain=domain, codomain=codomain)
-        elif sort == "ObjectTypeRelation":
-            kind = ObjectTypeRelation(name=name, domain=domain, codomain=codomain)
-        elif sort == "Variable":
-            kind = Variable(name=name, domain=domain, codomain=codomain)
-        elif sort == "Constant":
-            kind = Constant(name=name, codomain=codomain)
-        elif sort == "Operator":
-            print("Kind: operator not implemented yet")
-            #kind = Operator(name=name, domain=domain, codomain=codomain)
+    if sort in TYPE_CONSTRUCTORS:
+        kind = TYPE_CONSTRUCTORS[sort](name, kind_dict)
+    elif sort in ELEMENT_CONSTRUCTORS:
+        domain = kind_dict_to_kind(kind_dict['domain'])
+        codomain = kind_dict_to_kind(kind_dict['codomain'])
+        kind = ELEMENT_CONSTRUCTORS[sort](name, domain, codomain, kind_dict)
+    elif sort == "DatasetDesign":
+        log.debug("Kind DatasetDesign not implemented yet")
+    elif sort == "Operator":
+        log.debug("Kind: operator not implemented yet")
     return kind
 
 def path_to_kind_dict(path: Path) -> list:
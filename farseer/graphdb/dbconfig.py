@@ -2,6 +2,8 @@
 This file contains some configurations for working with Graph implemented in Neo4J
 """
 
+import os
+
 LOCAL = True #For debugging purposes. Set to true if working with local Neo4j database, set to False if working with remote.
 
 types = ["ObjectType", "Phenomenon", "Quantity", "Measure",\
@@ -9,6 +11,9 @@ types = ["ObjectType", "Phenomenon", "Quantity", "Measure",\
 elements = ["DatasetDesign", "ObjectTypeInclusion", "DatasetDescription",\
                 "PhenomenonMeasureMapping", "MeasureRepresentationMapping", "ObjectTypeRelation", \
                 "Variable" , "Constant", "Operator"]
+#Frozen copies of types and elements, for fast membership tests
+TYPES = frozenset(types)
+ELEMENTS = frozenset(elements)
 one_name = "1"
 one_type = "One"
 
@@ -20,4 +25,18 @@ if LOCAL:
 else:
     uri = "" #URL for neo4j database
     user = ""
-    password = ""
\ No newline at end of file
+    password = ""
+
+#Configuration of the connection pool of the driver, passed to GraphDatabase.driver().
+#The pool size can be set with the environment variable FARSEER_NEO4J_POOL; connections are replaced after
+#max_connection_lifetime seconds, and acquiring a connection from a full pool fails after connection_acquisition_timeout seconds.
+driver_config = {
+    "max_connection_pool_size": int(os.getenv("FARSEER_NEO4J_POOL", 64)),
+    "max_connection_lifetime": 1200,
+    "connection_acquisition_timeout": 60,
+    "keep_alive": True,
+}
+
+#Rebuild the domainmodel from the database on construction of the graph, instead of loading a snapshot of it, if the environment
+#variable FARSEER_REBUILD is set (to anything but 0). Needed after the database is edited outside farseer, see graphdb.get_graph().
+rebuild_snapshot = os.getenv("FARSEER_REBUILD", "0") not in ("", "0")
@@ -7,14 +7,25 @@ from farseer.domainmodel.dm import domainmodel
 from farseer.kind.knd import Phenomenon, ObjectType, Variable, ObjectTypeRelation, DatasetDesign, Quantity, Constant, Operator, Level, Kind
 from farseer.term.trm import Application, product, composition, cartesian_product
 import xml.etree.ElementTree as ET
-from farseer.graphdb.query_generation import create_node, create_relationship, add_type_label, add_element_label, clear
+from farseer.graphdb.query_generation import execute_read, execute_write, create_node, create_relationship, create_nodes, create_relationships, NODE_COLUMNS, RELATIONSHIP_COLUMNS, create_relationships_apoc, has_apoc, get_server_version, add_type_label, add_element_label, clear, create_constraints, stamp
 from typing import Tuple
-from farseer.graphdb.dbconfig import types, elements, one_name, one_type, uri, user, password
+from farseer.graphdb.dbconfig import TYPES, ELEMENTS, one_name, one_type, uri, user, password, driver_config
 from neo4j import GraphDatabase
-from typing import Union, List
+from typing import List
+from collections import defaultdict
+
+#Sorts of types created as nodes by create_all_dm_nodes()
+_NODE_SORTS = frozenset(["ObjectType", "Phenomenon", "Quantity", "Level"])
+#Sorts of elements created as relationships between their domain and codomain by create_all_relationships()
+_RELATIONSHIP_SORTS = frozenset(["ObjectTypeRelation", "Variable"])
 
 class GraphDB:
 
+    #Maximum number of rows written in one transaction by create_db_nodes() and create_db_relationships()
+    WRITE_BATCH_SIZE = 10000
+    #Number of relationships per transaction committed by apoc.periodic.iterate, if APOC is installed, see create_db_relationships()
+    APOC_BATCH_SIZE = 5000
+
     def __init__(self, uri: str, user: str, passw: str):
         """
         Construct a GraphDB object, which serves as an API between Python and the domainmodel stored in the database. 
@@ -25,8 +36,32 @@ class GraphDB:
             user (str): Username for database
             passw (str): Password for database
         """
-        self.driver = GraphDatabase.driver(uri, auth=(user, passw))
+        self.driver = GraphDatabase.driver(uri, auth=(user, passw), **driver_config)
         self.session = self.driver.session()
+        """
+        Whether APOC is installed in the database, checked on first use by uses_apoc().
+        """
+        self._has_apoc = None
+        """
+        Version of the Neo4j server, looked up on first use by server_version().
+        """
+        self._server_version = None
+
+    def server_version(self) -> tuple:
+        """
+        Look up (once) the (major, minor) version of the Neo4j server, see get_server_version()
+        """
+        if self._server_version is None:
+            self._server_version = execute_read(self.session, get_server_version)
+        return self._server_version
+
+    def uses_apoc(self) -> bool:
+        """
+        Check (once) whether relationships can be created in bulk with APOC, see create_db_relationships()
+        """
+        if self._has_apoc is None:
+            self._has_apoc = execute_read(self.session, has_apoc, self.server_version())
+        return self._has_apoc
 
     def create_db_node(self, name: str, sort: str, altname=None) -> None:
         """
@@ -34,9 +69,9 @@ class GraphDB:
 
         Args:
             name (str): name of kind, as given by: Kind.name
-            sort (str): sort of kind, as given by: Kind.__class__.__name__
+            sort (str): sort of kind, as given by: Kind.dbsort
         """
-        self.session.write_transaction(create_node, name, sort, altname)
+        execute_write(self.session, create_node, name, sort, altname)
 
     def create_db_relationship(self, name: str, sort: str, domain: str, domain_sort: str, codomain: str, codomain_sort: str, article=None, code=None) -> None:
         """
@@ -49,214 +84,67 @@ class GraphDB:
             name (str): Name of relationship
             sort (str): Sort of relationship, can be any relationship sort appearing in graphdb.dbconfig.elements
             domain (str): Name of the domain of the relationship. Needs to exist, otherwise exception should be raised. If domain is derived from Kind object, name is given by Kind.__class__.__name__.
-            domain_sort (str): Sort of the domain of the relationship. Can be any sort of type appearing in graphdb.dbconfig.types. If domain is derived from Kind object, sort is given by Kind.__class__.__name__
+            domain_sort (str): Sort of the domain of the relationship. Can be any sort of type appearing in graphdb.dbconfig.types. If domain is derived from Kind object, sort is given by Kind.dbsort
             codomain (str): Name of the domain of the relationship. Needs to exist, otherwise exception should be raised. If codomain is derived from Kind object, name is given by Kind.__class__.__name__.
-            codomain_sort (str): Sort of the codomain of the relationship. Can be any sort of type appearing in graphdb.dbconfig.types. If codomain is derived from Kind object, sort is given by Kind.__class__.__name__
+            codomain_sort (str): Sort of the codomain of the relationship. Can be any sort of type appearing in graphdb.dbconfig.types. If codomain is derived from Kind object, sort is given by Kind.dbsort
         """
 
-        self.session.write_transaction(create_relationship, name, sort, domain, domain_sort, codomain, codomain_sort, article, code)
+        execute_write(self.session, create_relationship, name, sort, domain, domain_sort, codomain, codomain_sort, article, code)
 
-    def get_kind(self, name: Union[str, Kind], sort: str = None) -> Kind:
+    def create_db_nodes(self, sort: str, rows: List[tuple]) -> None:
         """
-        Get Kind object from database node/edge
+        Create database nodes for all kinds of a given sort, in transactions of at most WRITE_BATCH_SIZE nodes each.
+        The rows are sent to the database as one list per property, see create_nodes().
 
         Args:
-            name (str): Name of kind
-            sort (str, optional): Sort of kind.
-                                    If none is provided, get_kind will first look for type with supplied name,
-                                    then look for edge with supplied name. Defaults to None.
-
-        Raises:
-            Exception: Unknown kind exception of sort of kind is not in farseer.graphdb.dbconfig
-            TypeError: Error when name and/or sort are not string.
-
-        Returns:
-            Kind: Kind object, as reconstructed from graph database.
+            sort (str): sort of kinds, as given by: Kind.dbsort
+            rows (List[tuple]): list of (name, altname) tuples
         """
-        if isinstance(name, Kind):
-            return name
-
-        if isinstance(name, str) & isinstance(sort, str):
-            if name in self.rebuilt_dm.keys():
-                return self.rebuilt_dm[name]
-            if sort in types:
-                node = self.session.read_transaction(get_node, name)
-                kind = self.dict_to_kind(query_result_to_dict(node))
-                return kind
-            elif sort in elements:
-                edge = self.session.read_transaction(get_edge, name)
-                kind = self.dict_to_kind(query_result_to_dict(edge))
-                return kind
-            else:
-                raise Exception("Sort of kind not known, see farseer.graphdb.dbconfig for list of known types and elements")
-
-        elif not sort and isinstance(name, str):
-
-            if name in self.rebuilt_dm.keys():
-                return self.rebuilt_dm[name]
-
-            node = self.session.read_transaction(get_node, name)
-            if node:
-                kind = self.dict_to_kind(query_result_to_dict(node))
-                return kind
-
-            edge = self.session.read_transaction(get_edge, name)
-            if edge:
-                kind = self.dict_to_kind(query_result_to_dict(edge))
-                return kind
-        elif not name:
-            return None
-        else:
-            raise TypeError("Cannot get kind, name and/or sort not string")
+        for start in range(0, len(rows), self.WRITE_BATCH_SIZE):
+            batch = rows[start:start + self.WRITE_BATCH_SIZE]
+            columns = {column: list(values) for (column, values) in zip(NODE_COLUMNS, zip(*batch))}
+            execute_write(self.session, create_nodes, sort, columns)
 
-    def get_paths(self, origin: Union[str, Kind], destination: Union[str, Kind]) -> List[List[Kind]]:
+    def create_db_relationships(self, sort: str, rows: List[tuple]) -> None:
         """
-        Get paths between origin and destination. 
-        Paths are given as a list containing relationships represented by correspond Kind objects. 
-        These appear in the order they are traversed when moving from origin to destination.
+        Create relationships for all elements of a given sort, in transactions of at most WRITE_BATCH_SIZE relationships each.
+        If APOC is installed, all rows are sent at once to apoc.periodic.iterate instead, which commits per APOC_BATCH_SIZE relationships.
+        See create_db_relationship() for the meaning of the fields of each row.
+        The rows are sent to the database as one list per property, see create_relationships().
 
         Args:
-            origin (Union[str, Kind]): Origin of path. Represented by either string with name of kind or Kind object.
-            destination (Union[str, Kind]):  Kind of path. Represented by either string with name of kind or Kind object.
-
-        Returns:
-            List[List[[Kind]]: List of paths represented by a list of relationships appearing in order from origin to destination.
+            sort (str): Sort of relationships, can be any relationship sort appearing in graphdb.dbconfig.elements
+            rows (List[tuple]): list of (name, domain, domain_sort, codomain, codomain_sort, article, code) tuples
         """
-        if isinstance(origin, Kind):
-            origin = origin.name
-        if isinstance(destination, Kind):
-            destination = destination.name
-        paths_list = []
-        if origin != None and destination != None:
-            paths = self.session.read_transaction(graph_paths, origin, destination)
-            paths_list = []
-            for path in paths:
-                path_list = []
-                path_as_kind_dicts = path_to_kind_dict(path)
-                for kind_dict in path_as_kind_dicts:
-                    kind = self.dict_to_kind(kind_dict)
-                    path_list.append(kind)
-                path_list.reverse()
-                paths_list.append(path_list)
-        return paths_list
-
-    def dict_to_kind(self, kind_dict: dict) -> Kind:
-        """Function turning kind dictionary as returned by query_result_to_dict() into proper Kind() object.
+        if rows and self.uses_apoc():
+            columns = {column: list(values) for (column, values) in zip(RELATIONSHIP_COLUMNS, zip(*rows))}
+            summary = create_relationships_apoc(self.session, sort, columns, self.APOC_BATCH_SIZE)
+            if summary['failedOperations']:
+                raise Exception("Creating %d relationships of sort %s failed: %s" % (summary['failedOperations'], sort, summary['errorMessages']))
+        else:
+            for start in range(0, len(rows), self.WRITE_BATCH_SIZE):
+                batch = rows[start:start + self.WRITE_BATCH_SIZE]
+                columns = {column: list(values) for (column, values) in zip(RELATIONSHIP_COLUMNS, zip(*batch))}
+                execute_write(self.session, create_relationships, sort, columns)
 
-        Args:
-            kind_dict (dict): Dictionary describing kind.
-            rebuilt_dm (dict, optional): Dictionary keeping track of parts of domainmodel that are stored in-memory for the duration of the question answering. Defaults to rebuilt_dm.
+    def clear_all(self):
+        execute_write(self.session, clear)
 
-        Returns:
-            Kind: Kind() object from knd module
+    def stamp_db(self):
+        """
+        Mark the database as changed, so that snapshots of the rebuilt domainmodel taken before are not used, see stamp()
         """
-        print("dict_to_kind(", kind_dict, ")")
-        name = kind_dict['name']
-        if name in list(self.rebuilt_dm.keys()): #if kind object has already been constructed, return that object from dictionary
-            print(name, "already built")
-            kind = self.rebuilt_dm[name]
-            return kind
-
-        sort = kind_dict['sort']
-        kind = None
-        if sort in types:
-            #Might be a better way to do this
-            if sort == "ObjectType":
-                if 'altname' in kind_dict.keys():
-                    altname = kind_dict['altname']
-                else:
-                    altname = None
-                kind = ObjectType(name=name, altname=altname)
-            elif sort == "Phenomenom":
-                kind = Phenomenon(name=name)
-            elif sort == "Quantity":
-                kind = Quantity(name=name)
-            elif sort == "Measure":
-                kind = Measure(name=name)
-            elif sort == "Unit":
-                kind = Unit(name=name)
-            elif sort == "Representation":
-                kind = Representation(name=name)
-            elif sort == "One":
-                print("Building one")
-                kind = One()
-            elif sort == "Level":
-                kind = Level(name=name)
-            elif sort == "Codelist":
-                kind = CodeList(name=name)
-            elif sort == "Phenomenon":
-                kind = Phenomenon(name=name)
-
-        elif sort in elements:
-            domain = self.dict_to_kind(json.loads(kind_dict['domain']))
-            codomain = self.dict_to_kind(json.loads(kind_dict['codomain']))
-
-            if sort == "DatasetDesign":
-                print("Kind DatasetDesign not implemented yet")
-                #kind = DatasetDesign(name=name, domain=domain, codomain=codomain)
-            elif sort == "ObjectTypeInclusion":
-                kind = ObjectTypeInclusion(name=name, domain=domain, codomain=codomain)
-            elif sort == "DatasetDescription":
-                kind = DatasetDescription(name=name, domain=domain, codomain=codomain)
-            elif sort == "PhenomenonMeasureMapping":
-                kind = PhenomenonMeasureMapping(name=name, domain=domain, codomain=codomain)
-            elif sort == "MeasureRepresentationMapping":
-                kind = MeasureRepresentationMapping(name=name, domain=domain, codomain=codomain)
-            elif sort == "ObjectTypeRelation":
-                kind = ObjectTypeRelation(name=name, domain=domain, codomain=codomain)
-            elif sort == "Variable":
-                if 'article' in kind_dict.keys():
-                    article = kind_dict['article']
-                else:
-                    article = None
-                kind = Variable(name=name, domain=domain, codomain=codomain, article=article)
-            elif sort == "Constant":
-                kind = Constant(name=name, codomain=codomain)
-            elif sort == "Operator":
-                print("Kind: operator not implemented yet")
-                #kind = Operator(name=name, domain=domain, codomain=codomain)
-        self.rebuilt_dm.update({name: kind})#add kind to rebuilt domainmodel
-        return kind
-
-    def parse_extra(self, file_name):
-        with open(os.path.join('extras', file_name), 'r') as extra_file:
-            reader = csv.reader(extra_file, delimiter = ';')
-            header = next(reader)
-            extras_dict = {}
-            if file_name == 'defaults.csv':
-                for row in reader:
-                    kind = self.get_kind(row[0], row[1])
-                    default_list = []
-                    for i in range(int((len(row)/2))-1):
-                        default = self.get_kind(row[2*i+2], row[2*i+3])
-                        default_list.append(default)
-                    extras_dict.update({kind: default_list})
-            elif file_name == 'interrogativepronouns.csv':
-                for row in reader:
-                    kind = self.get_kind(row[0], row[1])
-                    strng = row[2]
-                    extras_dict.update({kind: strng})
-            else:
-                for row in reader:
-                    kind_key = self.get_kind(row[0], row[1])
-                    kind_value = self.get_kind(row[2], row[3])
-                    extras_dict.update({kind_key: kind_value})
-            return extras_dict
-
-    def get_types_of_sort(self, which_sort: str):
-        types = self.session.read_transaction(get_nodes, which_sort)
-        type_list = [self.dict_to_kind(query_result_to_dict(t)) for t in types]
-        return type_list
+        execute_write(self.session, stamp)
 
-    def clear_all(self):
-        self.session.write_transaction(clear)
+    def create_db_constraints(self):
+        """
+        Create the constraints and indexes of the graph database, in the syntax of the server version, see create_constraints()
+        """
+        execute_write(self.session, create_constraints, self.server_version())
 
     def close(self):
         self.driver.close()
 
-graph = GraphDB(uri, user, password)
-
-
 def divide_types_and_elements(domainmodel: list, types: list, elements: list) -> Tuple[dict, dict]:
     """
     Creating database relationships before all nodes have been created leads to problems,
@@ -271,23 +159,17 @@ def divide_types_and_elements(domainmodel: list, types: list, elements: list) ->
     Returns:
         Tuple[dict, dict]: Tuple of dictionaries of the form {"kind of type": Kind(), "another}
     """
-    dm_types = {}
-    dm_elements = {}
+    types = frozenset(types)
+    elements = frozenset(elements)
+    dm_types = defaultdict(list)
+    dm_elements = defaultdict(list)
     for kind in domainmodel:
-        kind_of_kind = kind.__class__.__name__
+        kind_of_kind = kind.dbsort
         if kind_of_kind in types:
-            if kind_of_kind in list(dm_types.keys()):
-                dm_types[kind_of_kind].append(kind)
-            else:
-                dm_types.update({kind_of_kind: [kind]})
+            dm_types[kind_of_kind].append(kind)
         elif kind_of_kind in elements:
-            if kind_of_kind in list(dm_elements.keys()):
-                dm_elements[kind_of_kind].append(kind)
-            else:
-                dm_elements.update({kind_of_kind: [kind]})
-        else:
-            pass
-    return dm_types, dm_elements
+            dm_elements[kind_of_kind].append(kind)
+    return dict(dm_types), dict(dm_elements)
 
 def create_all_dm_nodes(graph: GraphDB, dm_types: dict, one_name: str, one_type: str):
     """Create all database nodes using this function.
@@ -300,11 +182,11 @@ def create_all_dm_nodes(graph: GraphDB, dm_types: dict, one_name: str, one_type:
     """
     #First, create node for the special object "one"
     graph.create_db_node(one_name, one_type)
-    #Second, go through dictionary of domainmodel types 
+    #Second, go through dictionary of domainmodel types, creating all nodes of a sort in one transaction
     for (key, value_list) in dm_types.items():
-        if key in ["ObjectType", "Phenomenon", "Quantity", "Level"]:
-            for dm_type in value_list:
-                graph.create_db_node(dm_type.name, key, dm_type.altname)
+        if key in _NODE_SORTS:
+            rows = [(dm_type.name, dm_type.altname or None) for dm_type in value_list]
+            graph.create_db_nodes(key, rows)
 
 def create_all_relationships(graph: GraphDB, dm_elements: dict, ones: list = None, alls: list = None):
     """Function to create all relationships between objects
@@ -315,36 +197,39 @@ def create_all_relationships(graph: GraphDB, dm_elements: dict, ones: list = Non
         alls (list): if alls are not in domainmodel, they should be supplied here
     """
 
-    #add domainmodel elements
+    #add domainmodel elements, all elements of a sort in one transaction
     for (key, element_list) in dm_elements.items():
-        if key in ["ObjectTypeRelation", "Variable"]: 
+        rows = []
+        if key in _RELATIONSHIP_SORTS:
             for element in element_list:
                 try: #add domain if specified
                     domain = element.domain.name
-                    domain_sort = element.domain.__class__.__name__
+                    domain_sort = element.domain.dbsort
                 except AttributeError:
                     print(f"No domain specified for {key} {element}")
                 try:
                     codomain = element.codomain.name
-                    codomain_sort = element.codomain.__class__.__name__
+                    codomain_sort = element.codomain.dbsort
                 except AttributeError:
                     print(f"No domain specified for {key} {element}")
-                graph.create_db_relationship(name = element.name, sort = key, codomain=codomain, codomain_sort=codomain_sort, domain=domain, domain_sort=domain_sort, article=element.article)
+                rows.append((element.name, domain, domain_sort, codomain, codomain_sort, element.article or None, None))
         if key == "Constant":
             for element in element_list:
                 try: #add domain if specified
                     codomain = element.codomain.name
-                    codomain_sort = element.codomain.__class__.__name__
+                    codomain_sort = element.codomain.dbsort
                 except AttributeError:
                     print(f"No codomain specified for {key} {element}")
                 domain = one_name
                 domain_sort = one_type
-                graph.create_db_relationship(name = element.name, sort = key, codomain=codomain, codomain_sort=codomain_sort, domain=domain, domain_sort=domain_sort, article=element.article, code=element.code)
+                rows.append((element.name, domain, domain_sort, codomain, codomain_sort, element.article or None, element.code or None))
         if key == "Operator":
             print("Operator not implemented in graph database")
             pass
         if key == "":
             pass
+        if rows:
+            graph.create_db_relationships(key, rows)
 def add_labels_to_nodes(session, label_name: str, label_dict: dict):
     """
     Function to add labels to nodes.
@@ -358,7 +243,7 @@ def add_labels_to_nodes(session, label_name: str, label_dict: dict):
     """
     for (key, value) in label_dict.items():
         var_val_tuple = (label_name, value)
-        session.write_transaction(add_type_label, key, var_val_tuple)
+        execute_write(session, add_type_label, key, var_val_tuple)
 
 def add_labels_to_relationships(session, label_name: str, label_dict: dict):
     """
@@ -373,16 +258,19 @@ def add_labels_to_relationships(session, label_name: str, label_dict: dict):
     """
     for (key, value) in label_dict.items():
         var_val_tuple = (label_name, value)
-        session.write_transaction(add_element_label, key, var_val_tuple)
+        execute_write(session, add_element_label, key, var_val_tuple)
 
 def make_graph():
 
+    graph = GraphDB(uri, user, password)
     graph.clear_all()
+    graph.create_db_constraints()
     
-    dm_types, dm_elements = divide_types_and_elements(domainmodel, types, elements)
+    dm_types, dm_elements = divide_types_and_elements(domainmodel, TYPES, ELEMENTS)
 
     create_all_dm_nodes(graph, dm_types, one_name, one_type)
-    create_all_relationships(graph, dm_elements, types, elements)
+    create_all_relationships(graph, dm_elements, TYPES, ELEMENTS)
+    graph.stamp_db()
 
 
 
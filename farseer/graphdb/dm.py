@@ -2,20 +2,19 @@
 Replacement for farseer.domainmodel.dm to import from. Used primarily by interpret modules.
 """
 
-from farseer.graphdb.graphdb import graph
+"""
+Attributes of the graph exposed by this module. These are fetched from the graph on first access (PEP 562),
+so that importing this module does not connect to the database.
+"""
+GRAPH_ATTRIBUTES = frozenset(['getal', 'one', 'defaults', 'interrogativepronouns', 'prefvar', 'overridetarget',
+                              'whichway', 'orientation', 'orderedobjecttype', 'gedeelddoor', 'data'])
 
 
-getal = graph.getal
-one = graph.one
-defaults = graph.defaults
-interrogativepronouns = graph.interrogativepronouns
-prefvar = graph.prefvar
-overridetarget = graph.overridetarget
-whichway = graph.whichway
-orientation = graph.orientation
-orderedobjecttype = graph.orderedobjecttype
-gedeelddoor = graph.gedeelddoor
-data = graph.data
+def __getattr__(name: str):
+    if name in GRAPH_ATTRIBUTES:
+        from farseer.graphdb.graphdb import get_graph
+        return getattr(get_graph(), name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 """
 domainmodel = dm[1]
 defaults = dm[3]
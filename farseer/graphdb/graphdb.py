@@ -7,37 +7,116 @@ in python due to their special roles or because of
 difficulties in implementing these in native Neo4J.
 """
 
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
 import json
-from farseer.graphdb.query_generation import create_node, create_relationship, get_edge, get_node, graph_paths, get_nodes
-from farseer.graphdb.dbconfig import types, elements, uri, user, password
-from farseer.graphdb.conversion import query_result_to_dict, path_to_kind_dict
+from farseer.graphdb.query_generation import execute_write, create_node, create_relationship, create_nodes, create_relationships, NODE_COLUMNS, RELATIONSHIP_COLUMNS, get_edge, get_node, get_nodes, get_all_nodes, iter_relationships, get_fingerprint, write_stamped, get_nodes_by_name, get_edges_by_name
+from farseer.graphdb.dbconfig import TYPES, ELEMENTS, uri, user, password, driver_config, rebuild_snapshot
+from farseer.graphdb.conversion import query_result_to_dict, TYPE_CONSTRUCTORS, ELEMENT_CONSTRUCTORS, json_loads
 from farseer.kind.knd import Kind
-from typing import Union, List
+from typing import Union, List, Set
 from farseer.kind.knd import Kind, Measure, Phenomenon, ObjectType, Variable , \
                                 ObjectTypeRelation, DatasetDesign, Quantity, Constant, Operator, Level, Unit, \
                                     Representation, CodeList, MeasureRepresentationMapping, ObjectTypeInclusion, DatasetDescription, PhenomenonMeasureMapping, One, one
 from farseer.term.trm import Application, product, composition, cartesian_product
+from farseer.term import trm
 
 import os
+import sys
 import csv
 import time
 import json
+import pickle
+import hashlib
+import atexit
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+#Folders holding the extras and the dataset designs
+_HERE = os.path.dirname(__file__)
+_EXTRAS_DIR = os.path.join(_HERE, 'extras')
+_DDESIGN_DIR = os.path.join(_HERE, 'datasetdesigns')
+
+"""
+Module level singletons of the kind and term modules. Snapshots of the rebuilt domainmodel refer to these by name,
+as interpret modules compare them by identity.
+"""
+SNAPSHOT_SINGLETONS = {'one': one, 'composition': trm.composition, 'product': trm.product, 'cartesian_product': trm.cartesian_product,
+                        'inclusion': trm.inclusion, 'selection': trm.selection, 'functional_type': trm.functional_type,
+                        'alpha': trm.alpha, 'inverse': trm.inverse, 'rnge': trm.rnge, 'projection': trm.projection}
+
+class _SnapshotPickler(pickle.Pickler):
+    """
+    Pickler for snapshots of the rebuilt domainmodel. The objects in SNAPSHOT_SINGLETONS are stored by name,
+    so that they are restored as the very same objects (see _SnapshotUnpickler).
+    """
+    singleton_names = {id(obj): name for (name, obj) in SNAPSHOT_SINGLETONS.items()}
+
+    def persistent_id(self, obj):
+        return self.singleton_names.get(id(obj))
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """
+    Unpickler for snapshots of the rebuilt domainmodel, see _SnapshotPickler.
+    """
+    def persistent_load(self, pid):
+        if pid in SNAPSHOT_SINGLETONS:
+            return SNAPSHOT_SINGLETONS[pid]
+        raise pickle.UnpicklingError("Unknown persistent id %s" % pid)
 
 class GraphDB:
 
-    def __init__(self, uri: str, user: str, passw: str):
+    #Maximum number of raw node or edge dictionaries kept by _cached_read(). When exceeded, the cache is cleared entirely.
+    KIND_DICT_CACHE_SIZE = 4096
+    #Maximum number of (origin, destination) pairs whose paths are kept by get_paths(). When exceeded, the cache is cleared entirely.
+    PATHS_CACHE_SIZE = 4096
+    #Maximum number of rows written in one transaction by create_db_nodes() and create_db_relationships()
+    WRITE_BATCH_SIZE = 10000
+    #Directory for snapshots of the rebuilt domainmodel, see __init__()
+    SNAPSHOT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'farseer')
+    #Attributes stored in a snapshot of the rebuilt domainmodel
+    SNAPSHOT_ATTRIBUTES = ['rebuilt_dm', 'getal', 'gedeelddoor', 'defaults', 'prefvar', 'whichway', 'overridetarget',
+                            'orientation', 'orderedobjecttype', 'interrogativepronouns', 'data', 'objecttypes']
+    #Attributes holding the extras, see parse_extras(), and the CSV in the ./extras folder each is parsed from
+    EXTRAS = {'defaults': 'defaults.csv', 'prefvar': 'prefvar.csv', 'whichway': 'whichway.csv', 'overridetarget': 'overridetarget.csv',
+              'orientation': 'orientation.csv', 'orderedobjecttype': 'orderedobjecttype.csv', 'interrogativepronouns': 'interrogativepronouns.csv'}
+    #Version of the layout of snapshots. Part of the snapshot path, so that snapshots of an older layout are not loaded.
+    SNAPSHOT_VERSION = 2
+
+    def __init__(self, uri: str, user: str, passw: str, rebuild: bool = False):
         """
         Construct a GraphDB object, which serves as an API between Python and the domainmodel stored in the database. 
         On initialization, the driver for database located at the given URI is created using supplied username and password. 
-        Then, a database session is created
+        Sessions are taken from the connection pool of the driver per query, see _read() and _write().
+        Rebuilding the domainmodel objects needed on initialization takes many queries. Therefore, the result is stored as a snapshot
+        in SNAPSHOT_DIR, under a fingerprint of the database and of the extras and datasetdesigns files. If a snapshot with a matching
+        fingerprint exists, it is loaded instead.
         Args:
             uri (str): URI for database
             user (str): Username for database
             passw (str): Password for database
+            rebuild (bool): Ignore an existing snapshot and rebuild from the database. Defaults to False.
         """
-        self.driver = GraphDatabase.driver(uri, auth=(user, passw))
-        self.session = self.driver.session()
+        self.driver = GraphDatabase.driver(uri, auth=(user, passw), **driver_config)
+        self._node_cache = {}
+        self._edge_cache = {}
+        self._primed = False
+        """
+        The relationships of the graph are loaded in memory on the first call of get_paths(), see _load_adjacency().
+        """
+        self._edges = None
+        self._edge_kinds = None
+        self._reaching = None
+        self._on_cycle = None
+        self._paths_cache = None
+        self._adjacency = None
+        self._reverse_adjacency = None
+        self.one = one
+        snapshot_path = self._get_snapshot_path()
+        if not rebuild and os.path.exists(snapshot_path) and self._load_snapshot(snapshot_path):
+            return
         """
         Initialize dictionary that keeps track of which kinds have been rebuilt from the graph database.
         This is dictionary is quite an important object, as python implementations of domainmodel objects 
@@ -46,29 +125,117 @@ class GraphDB:
         """
         self.rebuilt_dm = {}
         self.getal = Quantity(name='getal')
-        self.one = one
         self.rebuilt_dm.update({'1': self.one, 'getal': self.getal})
         self.gedeelddoor = Operator(name='(/)', domain=Application(cartesian_product,[self.getal, self.getal]), codomain=self.getal)
         """
+        Rebuild the whole domainmodel in two queries, so that the lookups below need not query the database one by one.
+        """
+        self._prime()
+        """
         Add extras. These include various mappings relating domainmodel objects to each other, 
         or strings representing linguistic classifications.
         """
-        self.defaults = self.parse_extra('defaults.csv')
-        self.prefvar = self.parse_extra('prefvar.csv')
-        self.whichway = self.parse_extra('whichway.csv')
-        self.overridetarget = self.parse_extra('overridetarget.csv')
-        self.orientation = self.parse_extra('orientation.csv')
-        self.orderedobjecttype = self.parse_extra('orderedobjecttype.csv')
-        self.interrogativepronouns = self.parse_extra('interrogativepronouns.csv')
+        for (attribute, extras_dict) in self.parse_extras().items():
+            setattr(self, attribute, extras_dict)
         """
         Add datasetdesign. Necessary for compiling SQL queries from terms. 
         """
-        self.data = [self.parse_datasetdesign(fp) for fp in os.listdir(os.path.join(os.path.dirname(__file__), "datasetdesigns"))]
+        with os.scandir(_DDESIGN_DIR) as entries:
+            self.data = [self.parse_datasetdesign(entry.name) for entry in entries]
         """
-        Add all objecttypes. Needed by get_origin(). 
+        Add all objecttypes, keyed by name. Needed by get_origin(). 
         Possibly, there exists a more 'Neo4j native' approach, however, this works and performance is satisfactory
         """
-        self.objecttypes = self.get_types_of_sort('ObjectType')
+        self.objecttypes = {objecttype.name: objecttype for objecttype in self.get_types_of_sort('ObjectType')}
+        self._save_snapshot(snapshot_path)
+
+    def _get_snapshot_path(self) -> str:
+        """
+        Return the path of the snapshot file for the current contents of the database and of the extras and datasetdesigns folders.
+
+        Returns:
+            str: path of snapshot file in SNAPSHOT_DIR
+        """
+        fingerprint = hashlib.sha256(repr((self.SNAPSHOT_VERSION, self._read(get_fingerprint))).encode())
+        for folder in [_EXTRAS_DIR, _DDESIGN_DIR]:
+            for file_name in sorted(os.listdir(folder)):
+                fingerprint.update(file_name.encode())
+                with open(os.path.join(folder, file_name), 'rb') as f:
+                    fingerprint.update(f.read())
+        return os.path.join(self.SNAPSHOT_DIR, 'dm-%s.pkl' % fingerprint.hexdigest())
+
+    def _save_snapshot(self, snapshot_path: str) -> None:
+        """
+        Store the attributes in SNAPSHOT_ATTRIBUTES as a snapshot. Failure to write the snapshot is not an error.
+
+        Args:
+            snapshot_path (str): path of snapshot file
+        """
+        snapshot = {attribute: getattr(self, attribute) for attribute in self.SNAPSHOT_ATTRIBUTES}
+        try:
+            os.makedirs(self.SNAPSHOT_DIR, exist_ok=True)
+            with open(snapshot_path + '.tmp', 'wb') as f:
+                _SnapshotPickler(f).dump(snapshot)
+            os.replace(snapshot_path + '.tmp', snapshot_path)
+        except OSError:
+            pass
+
+    def _load_snapshot(self, snapshot_path: str) -> bool:
+        """
+        Restore the attributes in SNAPSHOT_ATTRIBUTES from a snapshot. A snapshot that cannot be read (e.g. because it is truncated,
+        corrupt or refers to classes that no longer exist) is deleted, so that the domainmodel is rebuilt from the database instead.
+
+        Args:
+            snapshot_path (str): path of snapshot file
+
+        Returns:
+            bool: True if the snapshot was restored, False if it could not be read.
+        """
+        try:
+            with open(snapshot_path, 'rb') as f:
+                snapshot = _SnapshotUnpickler(f).load()
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError) as e:
+            log.warning("Cannot load snapshot %s, rebuilding from the database: %r", snapshot_path, e)
+            try:
+                os.remove(snapshot_path)
+            except OSError:
+                pass
+            return False
+        for (attribute, value) in snapshot.items():
+            setattr(self, attribute, value)
+        return True
+
+    def _read(self, query_function, *args):
+        """
+        Run a read query function from the query_generation module in a session from the connection pool of the driver.
+        Query functions run a single statement, which is executed as an auto-commit transaction:
+        this saves the round-trips for beginning and committing an explicit transaction.
+        The session is opened for read access, so that on a cluster reads may be routed to any member.
+
+        Args:
+            query_function: Query function, taking a transaction (or session) as first argument
+            args: Further arguments for the query function
+
+        Returns:
+            Result of the query function
+        """
+        with self.driver.session(default_access_mode=READ_ACCESS) as session:
+            return query_function(session, *args)
+
+    def _write(self, query_function, *args):
+        """
+        Run a write query function from the query_generation module in a transaction, in a session from the connection pool of the driver.
+        The database is stamped in the same transaction, so that snapshots taken before the write are not used, see write_stamped().
+
+        Args:
+            query_function: Query function, taking a transaction as first argument
+            args: Further arguments for the query function
+
+        Returns:
+            Result of the query function
+        """
+        with self.driver.session(default_access_mode=WRITE_ACCESS) as session:
+            return execute_write(session, write_stamped, query_function, *args)
 
     def create_db_node(self, name: str, sort: str, altname: str = None) -> None:
         """
@@ -76,10 +243,13 @@ class GraphDB:
 
         Args:
             name (str): name of kind, as given by: Kind.name
-            sort (str): sort of kind, as given by: Kind.__class__.__name__
+            sort (str): sort of kind, as given by: Kind.dbsort
             altname (str): alternative name, needed by inform module
         """
-        self.session.write_transaction(create_node, name, sort, altname)
+        self._write(create_node, name, sort, altname)
+        self._node_cache.pop(name, None)
+        self._primed = False
+        self._adjacency = None
 
     def create_db_relationship(self, name: str, sort: str, domain: str, domain_sort: str, codomain: str, codomain_sort: str, article: str = None) -> None:
         """
@@ -92,13 +262,50 @@ class GraphDB:
             name (str): Name of relationship
             sort (str): Sort of relationship, can be any relationship sort appearing in graphdb.dbconfig.elements
             domain (str): Name of the domain of the relationship. Needs to exist, otherwise exception should be raised. If domain is derived from Kind object, name is given by Kind.__class__.__name__.
-            domain_sort (str): Sort of the domain of the relationship. Can be any sort of type appearing in graphdb.dbconfig.types. If domain is derived from Kind object, sort is given by Kind.__class__.__name__
+            domain_sort (str): Sort of the domain of the relationship. Can be any sort of type appearing in graphdb.dbconfig.types. If domain is derived from Kind object, sort is given by Kind.dbsort
             codomain (str): Name of the domain of the relationship. Needs to exist, otherwise exception should be raised. If codomain is derived from Kind object, name is given by Kind.__class__.__name__.
-            codomain_sort (str): Sort of the codomain of the relationship. Can be any sort of type appearing in graphdb.dbconfig.types. If codomain is derived from Kind object, sort is given by Kind.__class__.__name__
+            codomain_sort (str): Sort of the codomain of the relationship. Can be any sort of type appearing in graphdb.dbconfig.types. If codomain is derived from Kind object, sort is given by Kind.dbsort
             article (str): article, required by inform module
         """
 
-        self.session.write_transaction(create_relationship, name, sort, domain, domain_sort, codomain, codomain_sort, article)
+        self._write(create_relationship, name, sort, domain, domain_sort, codomain, codomain_sort, article)
+        self._edge_cache.pop(name, None)
+        self._primed = False
+        self._adjacency = None
+
+    def create_db_nodes(self, sort: str, rows: List[tuple]) -> None:
+        """
+        Create database nodes for a number of kinds of a given sort, in transactions of at most WRITE_BATCH_SIZE nodes each.
+        The rows are sent to the database as one list per property, see create_nodes().
+
+        Args:
+            sort (str): sort of kinds, as given by: Kind.dbsort
+            rows (List[tuple]): list of (name, altname) tuples, see create_db_node()
+        """
+        for start in range(0, len(rows), self.WRITE_BATCH_SIZE):
+            batch = rows[start:start + self.WRITE_BATCH_SIZE]
+            self._write(create_nodes, sort, {column: list(values) for (column, values) in zip(NODE_COLUMNS, zip(*batch))})
+            for row in batch:
+                self._node_cache.pop(row[0], None)
+        self._primed = False
+        self._adjacency = None
+
+    def create_db_relationships(self, sort: str, rows: List[tuple]) -> None:
+        """
+        Create relationships for a number of elements of a given sort, in transactions of at most WRITE_BATCH_SIZE relationships each.
+        The rows are sent to the database as one list per property, see create_relationships().
+
+        Args:
+            sort (str): Sort of relationships, can be any relationship sort appearing in graphdb.dbconfig.elements
+            rows (List[tuple]): list of (name, domain, domain_sort, codomain, codomain_sort, article, code) tuples, see create_db_relationship()
+        """
+        for start in range(0, len(rows), self.WRITE_BATCH_SIZE):
+            batch = rows[start:start + self.WRITE_BATCH_SIZE]
+            self._write(create_relationships, sort, {column: list(values) for (column, values) in zip(RELATIONSHIP_COLUMNS, zip(*batch))})
+            for row in batch:
+                self._edge_cache.pop(row[0], None)
+        self._primed = False
+        self._adjacency = None
 
     def get_kind(self, name: Union[str, Kind], sort: str = None) -> Kind:
         """
@@ -120,54 +327,145 @@ class GraphDB:
         """
         if isinstance(name, Kind):
             return name
+        if isinstance(name, str):
+            name = sys.intern(name)
+            kind = self.rebuilt_dm.get(name)
+            if kind is not None:
+                return kind
 
         if isinstance(name, str) & isinstance(sort, str):
-            if name in self.rebuilt_dm.keys():
-                return self.rebuilt_dm[name]
-            if sort in types:
-                node = self.session.read_transaction(get_node, name)
-                if node:
-                    kind = self.dict_to_kind(query_result_to_dict(node))
-                    return kind
-            elif sort in elements:
-                edge = self.session.read_transaction(get_edge, name)
-                if edge:
-                    kind = self.dict_to_kind(query_result_to_dict(edge))
+            if sort in TYPES or sort in ELEMENTS:
+                kind_dict = self._fetch_kind_dict(name, sort)
+                if kind_dict:
+                    kind = self.dict_to_kind(kind_dict)
                     return kind
             else:
                 raise Exception("Sort of kind not known, see farseer.graphdb.dbconfig for list of known types and elements")
 
         elif not sort and isinstance(name, str):
-
-            if name in self.rebuilt_dm.keys():
-                return self.rebuilt_dm[name]
-
-            node = self.session.read_transaction(get_node, name)
-            if node:
-                kind = self.dict_to_kind(query_result_to_dict(node))
-                return kind
-
-            edge = self.session.read_transaction(get_edge, name)
-            if edge:
-                kind = self.dict_to_kind(query_result_to_dict(edge))
+            kind_dict = self._fetch_kind_dict(name, None)
+            if kind_dict:
+                kind = self.dict_to_kind(kind_dict)
                 return kind
         elif not name:
             return None
         else:
             raise TypeError("Cannot get kind, name and/or sort not string")
 
+    def _fetch_kind_dict(self, name: str, sort: str = None) -> dict:
+        """
+        Fetch the dictionary describing the kind with the given name from the database, as returned by query_result_to_dict().
+        The dictionaries of nodes and edges are served from self._node_cache and self._edge_cache, see _cached_read().
+
+        Args:
+            name (str): Name of kind
+            sort (str, optional): Sort of kind. If none is provided, nodes are searched first, then edges. Defaults to None.
+
+        Returns:
+            dict: Dictionary describing kind, empty if no such kind exists in the database.
+        """
+        kind_dict = {}
+        if sort is None or sort in TYPES:
+            kind_dict = self._cached_read(self._node_cache, get_node, name)
+        if not kind_dict and (sort is None or sort in ELEMENTS):
+            kind_dict = self._cached_read(self._edge_cache, get_edge, name)
+        return kind_dict
+
+    def _cached_read(self, cache: dict, query_function, name: str) -> dict:
+        """
+        Return the dictionary describing the node or edge with the given name, as returned by query_result_to_dict().
+        Results are memoized by name in cache, including misses (as an empty dictionary), so that repeated lookups
+        of the same name do not reissue queries. The cache is cleared entirely when it grows past KIND_DICT_CACHE_SIZE.
+        After _prime(), every node and edge in the database is in rebuilt_dm, and a name not in cache is known not to exist.
+
+        Args:
+            cache (dict): Either self._node_cache or self._edge_cache
+            query_function: Either get_node or get_edge
+            name (str): Name of node or edge
+
+        Returns:
+            dict: Dictionary describing node or edge, empty if there is none with the given name.
+        """
+        if name not in cache:
+            if self._primed:
+                return {}
+            if len(cache) >= self.KIND_DICT_CACHE_SIZE:
+                cache.clear()
+            cache[name] = query_result_to_dict(self._read(query_function, name))
+        return cache[name]
+
+    def _bulk_get_kinds(self, pairs: Set[tuple]) -> dict:
+        """
+        Get the Kind objects for a number of (name, sort) pairs, see get_kind().
+        The dictionaries of the names not rebuilt or cached yet are fetched in at most two queries, one for nodes and one for edges,
+        and stored in self._node_cache and self._edge_cache, so that the subsequent calls of get_kind() do not query the database.
+
+        Args:
+            pairs (Set[tuple]): Set of (name, sort) tuples, sort may be None
+
+        Returns:
+            dict: Dictionary mapping each (name, sort) tuple to the Kind object returned by get_kind()
+        """
+        if not self._primed:
+            node_names = set()
+            edge_names = set()
+            for (name, sort) in pairs:
+                if not name or name in self.rebuilt_dm:
+                    continue
+                if (not sort or sort in TYPES) and name not in self._node_cache:
+                    node_names.add(name)
+                if (not sort or sort in ELEMENTS) and name not in self._edge_cache:
+                    edge_names.add(name)
+            for (cache, query_function, names) in ((self._node_cache, get_nodes_by_name, node_names),
+                                                   (self._edge_cache, get_edges_by_name, edge_names)):
+                if names:
+                    if len(cache) + len(names) > self.KIND_DICT_CACHE_SIZE:
+                        cache.clear()
+                    cache.update({name: {} for name in names})
+                    cache.update({kind_dict['name']: kind_dict for kind_dict in self._read(query_function, list(names))})
+        return {pair: self.get_kind(*pair) for pair in pairs}
+
+    def _prime(self) -> None:
+        """
+        Load all nodes and relationships of the database in two queries and rebuild the Kind objects for all of them:
+        first the types, then the elements, whose domain and codomain are types and hence already rebuilt.
+        Afterwards, rebuilt_dm holds every kind in the database, and get_kind() no longer needs to query the database.
+        The dictionaries the kinds were rebuilt from are then released, except those of relationships whose kind
+        could not be rebuilt (see _get_edge_kind()).
+        The nodes are fetched in a separate thread, with a session of its own, while the relationships are loaded.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            nodes_future = executor.submit(self._read, get_all_nodes)
+            self._load_adjacency()
+            node_dicts = nodes_future.result()
+        self._node_cache = {node_dict['name']: node_dict for node_dict in node_dicts}
+        self._edge_cache = {edge_dict['name']: edge_dict for edge_dict in self._edges}
+        self._primed = True
+        for node_dict in node_dicts:
+            self.dict_to_kind(node_dict)
+        for edge_id in range(len(self._edges)):
+            self._get_edge_kind(edge_id)
+        self._node_cache = {}
+        self._edge_cache = {}
+        self._edges = [edge_dict if kind is None else None for (edge_dict, kind) in zip(self._edges, self._edge_kinds)]
+
     def get_paths(self, origin: Union[str, Kind], destination: Union[str, Kind]) -> List[List[Kind]]:
         """
         Get paths between origin and destination. 
         Paths are given as a list containing relationships represented by correspond Kind objects. 
-        These appear in the order they are traversed when moving from origin to destination.
+        These appear in reversed order, i.e. the last relationship traversed when moving from origin to destination comes first.
+        Paths are searched in memory, on the relationships loaded by _load_adjacency(): first, the nodes from which
+        the destination can be reached are collected by searching backwards from the destination, then all paths
+        from the origin are enumerated, never leaving this set of nodes.
+        The edge ids of the paths found are kept in self._paths_cache per (origin, destination) pair, until the relationships
+        are reloaded. Every call returns new lists, since callers modify the paths they get.
 
         Args:
             origin (Union[str, Kind]): Origin of path. Represented by either string with name of kind or Kind object.
             destination (Union[str, Kind]):  Kind of path. Represented by either string with name of kind or Kind object.
 
         Returns:
-            List[List[[Kind]]: List of paths represented by a list of relationships appearing in order from origin to destination.
+            List[List[[Kind]]: List of paths represented by a list of relationships appearing in reversed order from origin to destination.
         """
         if isinstance(origin, Kind):
             origin = origin.name
@@ -175,18 +473,169 @@ class GraphDB:
             destination = destination.name
         paths_list = []
         if origin != None and destination != None:
-            paths = self.session.read_transaction(graph_paths, origin, destination)
-            paths_list = []
-            for path in paths:
-                path_list = []
-                path_as_kind_dicts = path_to_kind_dict(path)
-                for kind_dict in path_as_kind_dicts:
-                    kind = self.dict_to_kind(kind_dict)
-                    path_list.append(kind)
-                path_list.reverse()
+            if self._adjacency is None:
+                self._load_adjacency()
+            edge_paths = self._paths_cache.get((origin, destination))
+            if edge_paths is None:
+                edge_paths = []
+                reaching = self._get_reaching(destination)
+                if origin in reaching:
+                    edge_paths = [edge_ids[::-1] for edge_ids in self._enumerate_paths(origin, {destination}, reaching)[destination]]
+                if len(self._paths_cache) >= self.PATHS_CACHE_SIZE:
+                    self._paths_cache.clear()
+                self._paths_cache[(origin, destination)] = edge_paths
+            for edge_ids in edge_paths:
+                path_list = [self._get_edge_kind(edge_id) for edge_id in edge_ids]
                 paths_list.append(path_list)
         return paths_list
 
+    def get_paths_batch(self, pairs: List[tuple]) -> dict:
+        """
+        Get paths for a number of (origin, destination) pairs at once, see get_paths().
+        The pairs are grouped by origin, and the paths from an origin to all its destinations (that are not in
+        self._paths_cache yet) are enumerated in a single depth-first search, instead of one search per destination.
+        Pairs occurring more than once are searched only once.
+
+        Args:
+            pairs (List[tuple]): List of (origin, destination) tuples, each represented by either string with name of kind or Kind object.
+
+        Returns:
+            dict: Dictionary mapping (name of origin, name of destination) tuples to the list of paths found by get_paths().
+        """
+        names = []
+        destinations = {}
+        for origin, destination in pairs:
+            if isinstance(origin, Kind):
+                origin = origin.name
+            if isinstance(destination, Kind):
+                destination = destination.name
+            names.append((origin, destination))
+            if origin != None and destination != None:
+                destinations.setdefault(origin, set()).add(destination)
+        if destinations and self._adjacency is None:
+            self._load_adjacency()
+        for origin, origin_destinations in destinations.items():
+            missing = [destination for destination in origin_destinations if (origin, destination) not in self._paths_cache]
+            if not missing:
+                continue
+            targets = set()
+            reaching = set()
+            for destination in missing:
+                destination_reaching = self._get_reaching(destination)
+                if origin in destination_reaching:
+                    targets.add(destination)
+                    reaching |= destination_reaching
+            found = self._enumerate_paths(origin, targets, reaching) if targets else {}
+            if len(self._paths_cache) + len(missing) > self.PATHS_CACHE_SIZE:
+                self._paths_cache.clear()
+            for destination in missing:
+                self._paths_cache[(origin, destination)] = [edge_ids[::-1] for edge_ids in found.get(destination, [])]
+        return {pair: self.get_paths(*pair) for pair in names}
+
+    def _load_adjacency(self) -> None:
+        """
+        Load all relationships of the graph database in memory, for path finding by get_paths().
+        The properties of each relationship are stored in self._edges, the index in this list serving as edge id.
+        The Kind objects of the relationships are kept in self._edge_kinds, under the same index, once constructed by _get_edge_kind().
+        self._adjacency maps node names to lists of (edge id, name of end node) tuples,
+        self._reverse_adjacency maps node names to the names of the start nodes of their incoming relationships.
+        The relationships are added as their records stream in, without first collecting all records in a list.
+        """
+        self._edges = []
+        self._adjacency = {}
+        self._reverse_adjacency = {}
+
+        def add_relationships(tx):
+            for (start, edge_dict, end) in iter_relationships(tx):
+                edge_id = len(self._edges)
+                self._edges.append(edge_dict)
+                self._adjacency.setdefault(start, []).append((edge_id, end))
+                self._reverse_adjacency.setdefault(end, []).append(start)
+
+        self._read(add_relationships)
+        self._edge_kinds = [None] * len(self._edges)
+        self._reaching = {}
+        self._on_cycle = {}
+        self._paths_cache = {}
+
+    def _get_edge_kind(self, edge_id: int) -> Kind:
+        """
+        Return the Kind object for the relationship with the given edge id, constructing it on first use only.
+        Paths sharing a relationship (e.g. paths with a common prefix) thus share the same Kind object
+        without going through dict_to_kind() again.
+
+        Args:
+            edge_id (int): Edge id, i.e. index in self._edges
+
+        Returns:
+            Kind: Kind object corresponding to the relationship
+        """
+        kind = self._edge_kinds[edge_id]
+        if kind is None:
+            kind = self.dict_to_kind(self._edges[edge_id])
+            self._edge_kinds[edge_id] = kind
+        return kind
+
+    def _get_reaching(self, destination: str) -> Set[str]:
+        """
+        Breadth-first search backwards from destination, collecting the names of all nodes from which destination can be reached.
+        The result only depends on the loaded relationships, hence it is kept in self._reaching per destination.
+
+        Args:
+            destination (str): Name of destination node
+
+        Returns:
+            Set[str]: Names of nodes from which there is a path to destination, including destination itself.
+        """
+        if destination in self._reaching:
+            return self._reaching[destination]
+        reaching = {destination}
+        frontier = deque([destination])
+        while frontier:
+            node = frontier.popleft()
+            for start in self._reverse_adjacency.get(node, []):
+                if start not in reaching:
+                    reaching.add(start)
+                    frontier.append(start)
+        self._reaching[destination] = reaching
+        return reaching
+
+    def _enumerate_paths(self, origin: str, destinations: Set[str], reaching: Set[str]) -> dict:
+        """
+        Enumerate all paths from origin to each of destinations, depth-first, as lists of edge ids in the order they are traversed.
+        Only nodes in reaching are visited, so that no work is spent on branches that cannot lead to any of destinations.
+        As in Neo4j's variable length patterns, a relationship is traversed at most once in a path.
+        Every node on a path to a destination can reach that destination, so the paths to each destination
+        (and their order) are the same as those found when searching for that destination alone.
+
+        Args:
+            origin (str): Name of origin node
+            destinations (Set[str]): Names of destination nodes
+            reaching (Set[str]): Names of nodes from which one of destinations can be reached, i.e. the union of the sets
+                                 returned by _get_reaching() for each of destinations
+
+        Returns:
+            dict: Dictionary mapping the name of each destination to its list of paths, each given as a list of edge ids
+        """
+        paths = {destination: [] for destination in destinations}
+        path = []
+        used = set()
+        stack = [iter(self._adjacency.get(origin, []))]
+        while stack:
+            for (edge_id, end) in stack[-1]:
+                if edge_id not in used and end in reaching:
+                    path.append(edge_id)
+                    used.add(edge_id)
+                    if end in paths:
+                        paths[end].append(list(path))
+                    stack.append(iter(self._adjacency.get(end, [])))
+                    break
+            else:
+                stack.pop()
+                if path:
+                    used.discard(path.pop())
+        return paths
+
     def get_origin(self, obj1: Union[str, Kind], obj2: Union[str, Kind]) -> Kind:
         """ 
         Return obj1 if there is at least one path from obj1 to obj2 in the
@@ -202,7 +651,7 @@ class GraphDB:
         Note also: 
         Current implementation needs all domainmodel objecttypes
         to be loaded in memory on initializing the GraphDB object, because they are being looped over. 
-        Again, possibly, there exists a more 'Neo4j native' approach, however, this works and performance is satisfactory.
+        Whether there is a path between two kinds is decided by has_path(), without enumerating the paths themselves.
 
         Args:
             obj1 (Union[str, Kind]): Kind or name of Kind. See description above for more info
@@ -214,20 +663,52 @@ class GraphDB:
     
         if obj1 == None:
             origin = obj2
-        elif self.get_paths(obj1, obj2) != []:
+        elif self.has_path(obj1, obj2):
             origin = obj1
-        elif self.get_paths(obj2, obj1) != []:
+        elif self.has_path(obj2, obj1):
             origin = obj2
         elif obj1 != None and obj2 != None and obj1 != obj2:
             origin = None
-            for obj in self.objecttypes:
-                if self.get_paths(obj, obj1) != [] and self.get_paths(obj, obj2) != []:
-                    if self.get_paths(origin, obj) != [] or origin == None:
+            for obj in self.objecttypes.values():
+                if self.has_path(obj, obj1) and self.has_path(obj, obj2):
+                    if origin == None or self.has_path(origin, obj):
                         origin = obj
         else:
             origin = obj1
         return self.get_kind(origin)
 
+    def has_path(self, origin: Union[str, Kind], destination: Union[str, Kind]) -> bool:
+        """
+        Return whether get_paths(origin, destination) would find at least one path, using the sets of nodes
+        collected by _get_reaching() only. Use this rather than testing the result of get_paths() for emptiness:
+        the number of paths can grow exponentially with the size of the graph, while this test takes linear time at most.
+        A path from a node to itself requires a cycle: a relationship into origin from a node that can be reached from origin.
+        Whether a node lies on a cycle is kept in self._on_cycle.
+
+        Args:
+            origin (Union[str, Kind]): Origin of path. Represented by either string with name of kind or Kind object.
+            destination (Union[str, Kind]):  Destination of path. Represented by either string with name of kind or Kind object.
+
+        Returns:
+            bool: True if there is a path from origin to destination.
+        """
+        if isinstance(origin, Kind):
+            origin = origin.name
+        if isinstance(destination, Kind):
+            destination = destination.name
+        if origin == None or destination == None:
+            return False
+        if self._adjacency is None:
+            self._load_adjacency()
+        if origin != destination:
+            return origin in self._get_reaching(destination)
+        try:
+            return self._on_cycle[origin]
+        except KeyError:
+            on_cycle = any(origin in self._get_reaching(start) for start in self._reverse_adjacency.get(origin, []))
+            self._on_cycle[origin] = on_cycle
+            return on_cycle
+
     def dict_to_kind(self, kind_dict: dict) -> Kind:
         """Function turning kind dictionary as returned by query_result_to_dict() into proper Kind() object.
 
@@ -238,75 +719,42 @@ class GraphDB:
         Returns:
             Kind: Kind() object from knd module
         """
-        name = kind_dict['name']
-        if name in list(self.rebuilt_dm.keys()): #if kind object has already been constructed, return that object from dictionary
-            kind = self.rebuilt_dm[name]
-            return kind
+        name = sys.intern(kind_dict['name'])
+        try:
+            return self.rebuilt_dm[name] #if kind object has already been constructed, return that object from dictionary
+        except KeyError:
+            pass
 
-        sort = kind_dict['sort']
+        sort = sys.intern(kind_dict['sort'])
         kind = None
-        if sort in types:
-            #Might be a better way to do this
-            if sort == "ObjectType":
-                if 'altname' in kind_dict.keys():
-                    altname = kind_dict['altname']
-                else:
-                    altname = None
-                kind = ObjectType(name=name, altname=altname)
-            elif sort == "Phenomenom":
-                kind = Phenomenon(name=name)
-            elif sort == "Quantity":
-                kind = Quantity(name=name)
-            elif sort == "Measure":
-                kind = Measure(name=name)
-            elif sort == "Unit":
-                kind = Unit(name=name)
-            elif sort == "Representation":
-                kind = Representation(name=name)
-            elif sort == "One":
-                kind = One()
-            elif sort == "Level":
-                kind = Level(name=name)
-            elif sort == "Codelist":
-                kind = CodeList(name=name)
-            elif sort == "Phenomenon":
-                kind = Phenomenon(name=name)
-
-        elif sort in elements:
-            domain = self.dict_to_kind(json.loads(kind_dict['domain']))
-            codomain = self.dict_to_kind(json.loads(kind_dict['codomain']))
-
-            if sort == "DatasetDesign":
-                print("Kind DatasetDesign not implemented yet")
-                #kind = DatasetDesign(name=name, domain=domain, codomain=codomain)
-            elif sort == "ObjectTypeInclusion":
-                kind = ObjectTypeInclusion(name=name, domain=domain, codomain=codomain)
-            elif sort == "DatasetDescription":
-                kind = DatasetDescription(name=name, domain=domain, codomain=codomain)
-            elif sort == "PhenomenonMeasureMapping":
-                kind = PhenomenonMeasureMapping(name=name, domain=domain, codomain=codomain)
-            elif sort == "MeasureRepresentationMapping":
-                kind = MeasureRepresentationMapping(name=name, domain=domain, codomain=codomain)
-            elif sort == "ObjectTypeRelation":
-                kind = ObjectTypeRelation(name=name, domain=domain, codomain=codomain)
-            elif sort == "Variable":
-                if 'article' in kind_dict.keys():
-                    article = kind_dict['article']
-                else:
-                    article = None
-                kind = Variable(name=name, domain=domain, codomain=codomain, article=article)
-            elif sort == "Constant":
-                if 'code' in kind_dict.keys():
-                    code = kind_dict['code']
-                else:
-                    code = None
-                kind = Constant(name=name, codomain=codomain, code=code)
-            elif sort == "Operator":
-                print("Kind: operator not implemented yet")
-                #kind = Operator(name=name, domain=domain, codomain=codomain)
+        if sort in TYPE_CONSTRUCTORS:
+            kind = TYPE_CONSTRUCTORS[sort](name, kind_dict)
+        elif sort in ELEMENT_CONSTRUCTORS:
+            domain = self.get_kind(kind_dict['domain_name'], kind_dict['domain_sort'])
+            codomain = self.get_kind(kind_dict['codomain_name'], kind_dict['codomain_sort'])
+            kind = ELEMENT_CONSTRUCTORS[sort](name, domain, codomain, kind_dict)
+        elif sort == "DatasetDesign":
+            log.debug("Kind DatasetDesign not implemented yet")
+        elif sort == "Operator":
+            log.debug("Kind: operator not implemented yet")
         self.rebuilt_dm.update({name: kind})#add kind to rebuilt domainmodel
         return kind
 
+    def parse_extras(self) -> dict:
+        """
+        Parse all CSV's listed in EXTRAS. All files are read first, then the kinds referred to in any of them
+        are looked up at once, see _bulk_get_kinds(), and finally the dictionaries are built.
+
+        Returns:
+            dict: Dictionary mapping the attribute names in EXTRAS to their dictionary of extras
+        """
+        rows = {attribute: self._read_extra(file_name) for (attribute, file_name) in self.EXTRAS.items()}
+        pairs = set()
+        for (attribute, file_name) in self.EXTRAS.items():
+            pairs.update(self._get_extra_pairs(file_name, rows[attribute]))
+        kinds = self._bulk_get_kinds(pairs)
+        return {attribute: self._build_extra(file_name, rows[attribute], kinds) for (attribute, file_name) in self.EXTRAS.items()}
+
     def parse_extra(self, file_name: str) -> dict:
         """
         Parse CSV's containing lookup tables relating certain domainmodel objects to each other,
@@ -318,30 +766,68 @@ class GraphDB:
         Returns:
             dict: Dictionary of extras
         """
-        dir_path = os.path.dirname(__file__)
-        with open(os.path.join(dir_path, 'extras', file_name), 'r') as extra_file:
+        rows = self._read_extra(file_name)
+        kinds = self._bulk_get_kinds(self._get_extra_pairs(file_name, rows))
+        return self._build_extra(file_name, rows, kinds)
+
+    def _read_extra(self, file_name: str) -> List[list]:
+        """
+        Read the rows of a CSV in the ./extras folder, skipping the header.
+
+        Args:
+            file_name (str): name of file containing table
+
+        Returns:
+            List[list]: rows of the table
+        """
+        with open(os.path.join(_EXTRAS_DIR, file_name), 'r', newline='', encoding='utf-8') as extra_file:
             reader = csv.reader(extra_file, delimiter = ';')
             header = next(reader)
-            extras_dict = {}
-            if file_name == 'defaults.csv':
-                for row in reader:
-                    kind = self.get_kind(row[0], row[1])
-                    default_list = []
-                    for i in range(int((len(row)/2))-1):
-                        default = self.get_kind(row[2*i+2], row[2*i+3])
-                        default_list.append(default)
-                    extras_dict.update({kind: default_list})
-            elif file_name == 'interrogativepronouns.csv':
-                for row in reader:
-                    kind = self.get_kind(row[0], row[1])
-                    strng = row[2]
-                    extras_dict.update({kind: strng})
-            else:
-                for row in reader:
-                    kind_key = self.get_kind(row[0], row[1])
-                    kind_value = self.get_kind(row[2], row[3])
-                    extras_dict.update({kind_key: kind_value})
-            return extras_dict
+            return list(reader)
+
+    def _get_extra_pairs(self, file_name: str, rows: List[list]) -> Set[tuple]:
+        """
+        Collect the distinct (name, sort) pairs referring to kinds in the rows of a CSV in the ./extras folder.
+
+        Args:
+            file_name (str): name of file containing table
+            rows (List[list]): rows of the table, as returned by _read_extra()
+
+        Returns:
+            Set[tuple]: Set of (name, sort) tuples
+        """
+        if file_name == 'defaults.csv':
+            return {pair for row in rows for pair in zip(row[0::2], row[1::2])}
+        elif file_name == 'interrogativepronouns.csv':
+            return {(row[0], row[1]) for row in rows}
+        else:
+            return {pair for row in rows for pair in zip(row[0:4:2], row[1:4:2])}
+
+    def _build_extra(self, file_name: str, rows: List[list], kinds: dict) -> dict:
+        """
+        Build the dictionary of extras from the rows of a CSV in the ./extras folder.
+
+        Args:
+            file_name (str): name of file containing table
+            rows (List[list]): rows of the table, as returned by _read_extra()
+            kinds (dict): Dictionary mapping the (name, sort) pairs of the table to kinds, as returned by _bulk_get_kinds()
+
+        Returns:
+            dict: Dictionary of extras
+        """
+        extras_dict = {}
+        if file_name == 'defaults.csv':
+            for row in rows:
+                kind = kinds[(row[0], row[1])]
+                extras_dict[kind] = [kinds[pair] for pair in zip(row[2::2], row[3::2])]
+        elif file_name == 'interrogativepronouns.csv':
+            extras_dict = {kinds[(row[0], row[1])]: row[2] for row in rows}
+        else:
+            for row in rows:
+                kind_key = kinds[(row[0], row[1])]
+                kind_value = kinds[(row[2], row[3])]
+                extras_dict[kind_key] = kind_value
+        return extras_dict
 
     def parse_datasetdesign(self, file_name: str) -> DatasetDesign:
         """
@@ -353,12 +839,11 @@ class GraphDB:
         Returns:
             DatasetDesign: object describing dataset design
         """
-        dir_path = os.path.dirname(__file__)
-        file_path = os.path.join(dir_path, 'datasetdesigns' , file_name)
+        file_path = os.path.join(_DDESIGN_DIR, file_name)
 
-        with open(file_path, 'r') as jsonfile:
+        with open(file_path, 'rb') as jsonfile:
 
-            data = json.loads(jsonfile.read())
+            data = json_loads(jsonfile.read())
 
             name = data["name"]
             constr = data["constr"]
@@ -387,7 +872,9 @@ class GraphDB:
 
     def get_types_of_sort(self, which_sort: str) -> List[Kind]:
         """
-        Simple utility to get all kind of a given sort
+        Simple utility to get all kind of a given sort.
+        Once the graph is primed (see _prime()), every node has been rebuilt in rebuilt_dm, so the types are taken from there
+        without querying the database.
 
         Args:
             which_sort (str): sort of interest
@@ -395,11 +882,44 @@ class GraphDB:
         Returns:
             List[Kind]: list of kinds of that sort
         """
-        types = self.session.read_transaction(get_nodes, which_sort)
-        type_list = [self.dict_to_kind(query_result_to_dict(t)) for t in types]
+        if self._primed and which_sort in TYPES:
+            return [kind for kind in self.rebuilt_dm.values() if kind is not None and kind.dbsort == which_sort]
+        types = self._read(get_nodes, which_sort)
+        type_list = [self.dict_to_kind(t) for t in types]
         return type_list
 
     def close(self):
         self.driver.close()
 
-graph = GraphDB(uri, user, password)
\ No newline at end of file
+
+_graph = None
+
+def get_graph(rebuild: bool = False) -> GraphDB:
+    """
+    Get the GraphDB object of the domainmodel, constructing it on first use.
+    Its driver, and with it the connection pool, is closed when the interpreter exits.
+    The domainmodel is rebuilt from the database rather than loaded from a snapshot if rebuild is True, or if the environment
+    variable FARSEER_REBUILD is set (see dbconfig). This is needed after the database was edited outside farseer, as such edits
+    do not change the fingerprint the snapshot is stored under. If the graph exists already, rebuild replaces it.
+
+    Args:
+        rebuild (bool): Rebuild the domainmodel from the database. Defaults to False.
+
+    Returns:
+        GraphDB: The GraphDB object connected to the database configured in dbconfig.
+    """
+    global _graph
+    if _graph is None or rebuild:
+        if _graph is not None:
+            _graph.close()
+        _graph = GraphDB(uri, user, password, rebuild=rebuild or rebuild_snapshot)
+        atexit.register(_graph.close)
+    return _graph
+
+def __getattr__(name: str):
+    """
+    Construct the module level graph on first access (PEP 562), so that importing this module does not connect to the database.
+    """
+    if name == 'graph':
+        return get_graph()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
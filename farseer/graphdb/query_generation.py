@@ -5,20 +5,109 @@ For example, creating a node in the graph is done by calling GraphDB.create_node
 with input the create_node() function defined in this module. 
 """
 
-from neo4j import GraphDatabase
 from farseer.kind.knd import Kind
-from typing import List
-from neo4j import Transaction
+import re
+from typing import List, Iterator
+from neo4j import Transaction, Session
 from neo4j.work.result import Result
-from farseer.graphdb.dbconfig import uri, user, password
+from farseer.graphdb.conversion import kind_to_json
 
-driver = GraphDatabase.driver(uri, auth=(user, password))
+"""
+Static read queries. Values are passed as query parameters, so that the text of a query is the same on every call
+and Neo4j reuses its cached query plan.
+"""
+SHORTESTPATH_QUERY = """MATCH (a:Type {name: $start}), (b:Type {name: $end}), p=shortestPath((a)-[*]->(b)) RETURN p"""
+GRAPH_PATHS_QUERY = """MATCH (a:Type {name: $start}), (b:Type {name: $end}), p=(a)-[*]->(b) RETURN [r IN relationships(p) | properties(r)]"""
+GET_ALL_NODES_QUERY = """MATCH (n:Type) RETURN properties(n)"""
+GET_RELATIONSHIPS_QUERY = """MATCH (a)-[r]->(b) RETURN a.name, properties(r), b.name"""
+GET_NODES_QUERY = """MATCH (a:Type {sort: $sort}) RETURN collect(properties(a))"""
+GET_FINGERPRINT_QUERY = """MATCH (n:Type) WITH count(n) AS nodes, max(n.name) AS node_name
+    OPTIONAL MATCH ()-[r:Element]->() WITH nodes, node_name, count(r) AS relationships, max(r.name) AS relationship_name
+    OPTIONAL MATCH (s:Stamp {name: 'farseer'}) RETURN nodes, relationships, node_name, relationship_name, s.stamp"""
+GET_NODE_QUERY = """MATCH (a:Type {name: $name}) RETURN a"""
+GET_EDGE_QUERY = """MATCH (a)-[r {name: $name}]->(b) RETURN r"""
+GET_NODES_BY_NAME_QUERY = """MATCH (a:Type) WHERE a.name IN $names RETURN properties(a)"""
+GET_EDGES_BY_NAME_QUERY = """MATCH (a)-[r:Element]->(b) WHERE r.name IN $names RETURN properties(r)"""
+SERVER_VERSION_QUERY = """CALL dbms.components() YIELD name, versions WHERE name = 'Neo4j Kernel' RETURN versions[0]"""
+
+"""
+Static write queries creating a single node or relationship, see create_node() and create_relationship().
+Setting a property to null leaves it out, so optional properties need not change the text of the query.
+"""
+CREATE_NODE_QUERY = """CREATE (a:Type {name: $name, sort: $sort}) SET a.altname = $altname RETURN id(a)"""
+CREATE_RELATIONSHIP_QUERY = """MATCH (a:Type {name: $domain}), (b:Type {name: $codomain})
+    CREATE (a)-[r:Element {name: $name, sort: $sort}]->(b)
+    SET r.article = $article, r.code = $code,
+        r.codomain_name = $codomain, r.codomain_sort = $codomain_sort,
+        r.domain_name = $domain, r.domain_sort = $domain_sort"""
+
+"""
+Query marking the database as changed, see stamp(). The Stamp node is not labeled Type, so the queries above do not see it.
+"""
+STAMP_QUERY = """MERGE (s:Stamp {name: 'farseer'}) SET s.stamp = randomUUID()"""
+
+"""
+Queries for bulk creation of relationships with APOC, if installed, see create_relationships_apoc().
+The outer statement produces the properties of one relationship per row, the inner statement is run per batch of rows.
+"""
+HAS_APOC_QUERY = """SHOW PROCEDURES YIELD name WHERE name = 'apoc.periodic.iterate' RETURN count(name) > 0"""
+HAS_APOC_QUERY_PRE_4_4 = """CALL dbms.procedures() YIELD name WHERE name = 'apoc.periodic.iterate' RETURN count(name) > 0"""
+CREATE_RELATIONSHIPS_APOC_QUERY = """CALL apoc.periodic.iterate(
+    "UNWIND range(0, size($name) - 1) AS i
+        RETURN $name[i] AS name, $domain[i] AS domain, $domain_sort[i] AS domain_sort, $codomain[i] AS codomain,
+            $codomain_sort[i] AS codomain_sort, $article[i] AS article, $code[i] AS code",
+    "MATCH (a:Type {name: domain}), (b:Type {name: codomain})
+        CREATE (a)-[r:Element {name: name, sort: $sort}]->(b)
+        SET r.article = article, r.code = code,
+            r.codomain_name = codomain, r.codomain_sort = codomain_sort,
+            r.domain_name = domain, r.domain_sort = domain_sort",
+    {batchSize: $batch_size, parallel: false, params: apoc.map.merge($columns, {sort: $sort})})
+    YIELD failedOperations, errorMessages
+    RETURN failedOperations, errorMessages"""
+
+"""
+Names of the query parameters holding the properties of the nodes and relationships created by create_nodes() and create_relationships().
+"""
+NODE_COLUMNS = ("name", "altname")
+RELATIONSHIP_COLUMNS = ("name", "domain", "domain_sort", "codomain", "codomain_sort", "article", "code")
 
 #QUERY GENERATION AND EXECUTION
+def execute_read(session: Session, query_function, *args):
+    """
+    Run a query function in a read transaction, which the driver retries on transient errors.
+    Uses session.execute_read() where the driver has it (5.x), and session.read_transaction(), its name in 4.x, otherwise.
+
+    Args:
+        session (Session): Neo4J session object
+        query_function: Query function from this module, taking a transaction as first argument
+        args: Further arguments for the query function
+
+    Returns:
+        Result of the query function
+    """
+    run = getattr(session, "execute_read", None) or session.read_transaction
+    return run(query_function, *args)
+
+def execute_write(session: Session, query_function, *args):
+    """
+    Run a query function in a write transaction, which the driver retries on transient errors.
+    Uses session.execute_write() where the driver has it (5.x), and session.write_transaction(), its name in 4.x, otherwise.
+
+    Args:
+        session (Session): Neo4J session object
+        query_function: Query function from this module, taking a transaction as first argument
+        args: Further arguments for the query function
+
+    Returns:
+        Result of the query function
+    """
+    run = getattr(session, "execute_write", None) or session.write_transaction
+    return run(query_function, *args)
+
 def create_node(tx: Transaction, name: str, sort: str, altname = None):
     """
     Generate and run query to create graph node for Kind with given name and sort.
-    This function gets called by Neo4j's session.write_transaction() function.
+    This function gets called by Neo4j's session.write_transaction() function (see execute_write()).
     See GraphDB.create_node() function for more details
 
     Args:
@@ -26,16 +115,12 @@ def create_node(tx: Transaction, name: str, sort: str, altname = None):
         name (string): Name of Kind
         sort (string): Sort of Kind
     """
-    query = """CREATE (a:Type {name:"%(name)s", sort:"%(sort)s" """ % {"name": name, "sort": sort}
-    if altname:
-        query = query + """, altname:"%(altname)s" """ % {"altname": altname}
-    query = query + """}) RETURN id(a)"""
-    tx.run(query)
+    tx.run(CREATE_NODE_QUERY, name=name, sort=sort, altname=altname or None)
 
 def create_relationship(tx: Transaction, name: str, sort: str, domain: str, domain_sort: str, codomain: str, codomain_sort: str, article: str = None, code: str = None):
     """
     Generate and run query to create graph relationship for Kind with given name and sort.
-    This function gets called by Neo4j's session.write_transaction() function.
+    This function gets called by Neo4j's session.write_transaction() function (see execute_write()).
     See GraphDB.create_relationship() function for more details
 
     Args:
@@ -49,27 +134,97 @@ def create_relationship(tx: Transaction, name: str, sort: str, domain: str, doma
         article (string): article of element. Defaults to None.
         code (string): code of element. Defaults to None.
     """
-    #Start base query to create relationship
-    query = """MATCH (a:Type {name:"%(domain)s"}), (b:Type {name:"%(codomain)s"}) CREATE (a)-[r:Element {name:"%(name)s", sort:"%(sort)s" """ % {"codomain": codomain, "domain": domain, "name": name, "sort": sort}
-    #Add article if provided
-    if article:
-        query += """, article:"%(article)s" """ % {"article": article}
-    #Add code if provided
-    if code:
-        query += """, code:"%(code)s" """ % {"code": code}
-    #Finish base query to create relationship
-    query += """}]->(b)"""
-    #Set additional attributes
-    query += """ SET r.codomain = '{"name": "%(codomain)s", "sort":"%(codomain_sort)s"}' SET r.domain = '{"name": "%(domain)s", "sort":"%(domain_sort)s"}' """ % {"codomain": codomain, "codomain_sort": codomain_sort, "domain": domain, "domain_sort": domain_sort}
-    tx.run(query)
+    tx.run(CREATE_RELATIONSHIP_QUERY, name=name, sort=sort, domain=domain, domain_sort=domain_sort, codomain=codomain,
+           codomain_sort=codomain_sort, article=article or None, code=code or None)
 
-def shortestpath(tx, start: str, end: str):
-    query = "MATCH (a:Type {name:'%(start)s'}), (b:Type {name:'%(end)s'}), p=shortestPath((a)-[*]->(b)) RETURN p" % {"start": start, "end": end}
+def create_nodes(tx: Transaction, sort: str, columns: dict):
+    """
+    Generate and run a single query creating graph nodes for all Kinds of a given sort.
+    The properties are sent as query parameters holding one list per property (rather than one dictionary per node),
+    and unwound server-side by index, so a whole sort is created in one round-trip instead of one transaction per Kind.
+    See create_node() for the properties of the created nodes.
+
+    Args:
+        tx (transaction): Neo4J transaction object
+        sort (string): Sort of the Kinds
+        columns (dict): Dictionary mapping each name in NODE_COLUMNS to a list of values, one per Kind
+    """
+    query = """UNWIND range(0, size($name) - 1) AS i
+        CREATE (a:Type {name: $name[i], sort: $sort}) SET a.altname = $altname[i]"""
+    tx.run(query, sort=sort, **columns)
+
+def create_relationships(tx: Transaction, sort: str, columns: dict):
+    """
+    Generate and run a single query creating graph relationships for all Kinds of a given sort.
+    The properties are sent as query parameters holding one list per property, and unwound server-side by index.
+    See create_relationship() for the properties of the created relationships.
+
+    Args:
+        tx (transaction): Neo4J transaction object
+        sort (string): Sort of the Kinds
+        columns (dict): Dictionary mapping each name in RELATIONSHIP_COLUMNS to a list of values, one per Kind
+    """
+    query = """UNWIND range(0, size($name) - 1) AS i
+        MATCH (a:Type {name: $domain[i]}), (b:Type {name: $codomain[i]})
+        CREATE (a)-[r:Element {name: $name[i], sort: $sort}]->(b)
+        SET r.article = $article[i], r.code = $code[i],
+            r.codomain_name = $codomain[i], r.codomain_sort = $codomain_sort[i],
+            r.domain_name = $domain[i], r.domain_sort = $domain_sort[i]"""
+    tx.run(query, sort=sort, **columns)
+
+def get_server_version(tx: Transaction) -> tuple:
+    """
+    Get the version of the Neo4j server, which decides the syntax of some statements, see create_constraints().
+
+    Args:
+        tx (transaction): Neo4J transaction object
+
+    Returns:
+        tuple: (major, minor) version numbers, e.g. (4, 4)
+    """
+    version = tx.run(SERVER_VERSION_QUERY).single().value()
+    return tuple(int(number) for number in re.findall(r'\d+', version)[:2])
+
+def has_apoc(tx: Transaction, server_version: tuple = (4, 4)) -> bool:
+    """
+    Check whether the APOC procedure apoc.periodic.iterate is installed in the database.
+    Procedures are listed by SHOW PROCEDURES from 4.4 on (dbms.procedures() no longer exists in 5.x), and by dbms.procedures() before that.
+
+    Args:
+        tx (transaction): Neo4J transaction object
+        server_version (tuple): (major, minor) version of the server, see get_server_version(). Defaults to (4, 4).
+
+    Returns:
+        bool: True if apoc.periodic.iterate can be called
+    """
+    query = HAS_APOC_QUERY if server_version >= (4, 4) else HAS_APOC_QUERY_PRE_4_4
     return tx.run(query).single().value()
 
-def graph_paths(tx: Transaction, start: str, end: str) -> List[Result]:
+def create_relationships_apoc(session: Session, sort: str, columns: dict, batch_size: int) -> dict:
+    """
+    Create graph relationships for all Kinds of a given sort with apoc.periodic.iterate, which commits a transaction per batch_size relationships.
+    See create_relationships() for the columns. As apoc.periodic.iterate opens transactions of its own,
+    the query must be run in an auto-commit transaction (session.run()), not in a transaction function.
+    The batches are not run in parallel: relationships of the same batch share nodes, and would wait for each others locks.
+
+    Args:
+        session (Session): Neo4J session object
+        sort (string): Sort of the Kinds
+        columns (dict): Dictionary mapping each name in RELATIONSHIP_COLUMNS to a list of values, one per Kind
+        batch_size (int): Number of relationships per transaction
+
+    Returns:
+        dict: Summary of apoc.periodic.iterate, with the number of failed operations and their error messages
+    """
+    return session.run(CREATE_RELATIONSHIPS_APOC_QUERY, sort=sort, batch_size=batch_size, columns=columns).single().data()
+
+def shortestpath(tx, start: str, end: str):
+    return tx.run(SHORTESTPATH_QUERY, start=start, end=end).single().value()
+
+def graph_paths(tx: Transaction, start: str, end: str) -> List[List[dict]]:
     """
-    Find all paths in database between start and end. Return a Result object which need further parsing.
+    Find all paths in database between start and end.
+    The properties of the relationships of each path are projected server-side, so no Path objects need to be sent and parsed.
     See GraphDB.get_paths() for more info.
 
     Args:
@@ -78,37 +233,127 @@ def graph_paths(tx: Transaction, start: str, end: str) -> List[Result]:
         end (str): Name of end node
 
     Returns:
-        List[Result]: List of neo4j.work.result.Result objects containing information about paths.
+        List[List[dict]]: List of paths, each a list of dictionaries with the properties of the relationships in the order they are traversed.
     """
-    query = "MATCH (a:Type {name:'%(start)s'}), (b:Type {name:'%(end)s'}), p=(a)-[*]->(b) RETURN p" % {"start": start, "end": end}
-    results = tx.run(query).value()
-    return [result for result in results]
+    return tx.run(GRAPH_PATHS_QUERY, start=start, end=end).value()
 
-def get_nodes(tx: Transaction, which_sort: str) -> List[Result]:
+def get_all_nodes(tx: Transaction) -> List[dict]:
+    """
+    Get the properties of all nodes in the database. See GraphDB._prime().
+
+    Args:
+        tx (Transaction): Neo4j transaction object
+
+    Returns:
+        List[dict]: List of dictionaries with the properties of each node.
+    """
+    return tx.run(GET_ALL_NODES_QUERY).value()
+
+def iter_relationships(tx: Transaction) -> Iterator[tuple]:
+    """
+    Get all relationships in the database, together with the names of the nodes they connect.
+    Used to hold the graph in memory for path finding, see GraphDB._load_adjacency().
+    The relationships are yielded as their records arrive, so that no list of all records is built.
+    The generator must be consumed before the transaction (or session) it was given is closed.
+
+    Args:
+        tx (Transaction): Neo4j transaction object
+
+    Yields:
+        tuple: (start name, relationship properties, end name) record
+    """
+    yield from tx.run(GET_RELATIONSHIPS_QUERY)
+
+def get_nodes(tx: Transaction, which_sort: str) -> List[dict]:
     """
     Get multiple nodes of a given sort.
+    The properties of the nodes are collected in a single record, rather than returned as one record per node.
 
     Args:
         tx (Transaction): Neo4j transaction object
         which_sort (str): sort of kinds to be retrieved
 
     Returns:
-        List[Result]: List of Neo4j results representing the nodes.
+        List[dict]: List of dictionaries with the properties of the nodes.
     """    
-    QUERY = """MATCH (a {sort: '%(sort)s'}) RETURN a""" % {"sort": which_sort}
-    results = tx.run(QUERY).value()
-    return [result for result in results]
+    return tx.run(GET_NODES_QUERY, sort=which_sort).single().value()
+
+def get_nodes_by_name(tx: Transaction, names: List[str]) -> List[dict]:
+    """
+    Get the properties of all nodes whose name is in names, in a single query. See GraphDB._bulk_get_kinds().
+
+    Args:
+        tx (Transaction): Neo4j transaction object
+        names (List[str]): Names of the nodes to be retrieved
+
+    Returns:
+        List[dict]: List of dictionaries with the properties of the nodes found.
+    """
+    return tx.run(GET_NODES_BY_NAME_QUERY, names=names).value()
+
+def get_edges_by_name(tx: Transaction, names: List[str]) -> List[dict]:
+    """
+    Get the properties of all relationships whose name is in names, in a single query. See GraphDB._bulk_get_kinds().
+
+    Args:
+        tx (Transaction): Neo4j transaction object
+        names (List[str]): Names of the relationships to be retrieved
+
+    Returns:
+        List[dict]: List of dictionaries with the properties of the relationships found.
+    """
+    return tx.run(GET_EDGES_BY_NAME_QUERY, names=names).value()
+
+def get_fingerprint(tx: Transaction) -> list:
+    """
+    Get a cheap fingerprint of the contents of the database: the number of nodes and relationships,
+    the greatest node and relationship names, and the stamp set by stamp() on every write made through farseer.
+    Used to validate snapshots of the rebuilt domainmodel, see GraphDB.__init__().
+    Edits made outside farseer (e.g. in the Neo4j browser) do not change the stamp: rebuild the snapshot after those,
+    see get_graph().
+
+    Args:
+        tx (Transaction): Neo4j transaction object
+
+    Returns:
+        list: [number of nodes, number of relationships, greatest node name, greatest relationship name, stamp]
+    """
+    return tx.run(GET_FINGERPRINT_QUERY).single().values()
+
+def stamp(tx: Transaction):
+    """
+    Mark the database as changed, by giving the Stamp node a new random stamp, so that the fingerprint
+    returned by get_fingerprint() changes and snapshots of the rebuilt domainmodel are no longer used.
+
+    Args:
+        tx (Transaction): Neo4j transaction object
+    """
+    tx.run(STAMP_QUERY)
+
+def write_stamped(tx: Transaction, query_function, *args):
+    """
+    Run a write query function and stamp() the database in the same transaction.
+
+    Args:
+        tx (Transaction): Neo4j transaction object
+        query_function: Query function from this module, taking a transaction as first argument
+        args: Further arguments for the query function
+
+    Returns:
+        Result of the query function
+    """
+    result = query_function(tx, *args)
+    stamp(tx)
+    return result
 
 def get_node(tx, node_name: str) -> Result:
-    QUERY = """MATCH (a {name: "%(name)s"}) RETURN a""" % {"name": node_name}
-    result = tx.run(QUERY).single()
+    result = tx.run(GET_NODE_QUERY, name=node_name).single()
     if result:
         result = result.value()
     return result
 
 def get_edge(tx, edge_name: str) -> Result:
-    QUERY = """MATCH (a)-[r {name: "%(edge_name)s"}]->(b) RETURN r""" % {"edge_name": edge_name}
-    result = tx.run(QUERY).single()
+    result = tx.run(GET_EDGE_QUERY, name=edge_name).single()
     if result:
         result = result.value()
     return result
@@ -117,41 +362,71 @@ def clear(tx):
     tx.run("""MATCH (n) DETACH DELETE (n)""")
     print("Graph cleared")
 
+def create_constraints(tx: Transaction, server_version: tuple = (4, 4)):
+    """
+    Create a uniqueness constraint on the name of nodes labeled Type, if not present yet.
+    The constraint comes with an index, so that nodes are matched by name with an index seek instead of a label scan,
+    both when creating relationships and when getting nodes.
+    Servers from 4.4 on accept the FOR ... REQUIRE syntax, which 5.x requires; older servers only know ON ... ASSERT.
+
+    Args:
+        tx (transaction): Neo4J transaction object
+        server_version (tuple): (major, minor) version of the server, see get_server_version(). Defaults to (4, 4).
+    """
+    if server_version >= (4, 4):
+        tx.run("""CREATE CONSTRAINT type_name IF NOT EXISTS FOR (a:Type) REQUIRE a.name IS UNIQUE""")
+    else:
+        tx.run("""CREATE CONSTRAINT type_name IF NOT EXISTS ON (a:Type) ASSERT a.name IS UNIQUE""")
+
 """
 Now follow some functions for adding labels. 
 Currently, these are not being used.
 """
 
+def _quote_identifier(identifier: str) -> str:
+    """
+    Quote a label or property key for use in a query. Unlike values, these cannot be passed as query parameters.
+
+    Args:
+        identifier (str): Label or property key
+
+    Returns:
+        str: identifier between backticks, with any backtick in it doubled
+    """
+    return f"`{identifier.replace('`', '``')}`"
+
 def set_object_label(tx, type: str, name: str, var_val_dict: dict):
-    query = "MATCH (a:%(type)s {name:'%(name)s'})" % {"type": type, "name": name}
-    for (variable, value) in list(var_val_dict.items()):
-        if not isinstance(value, list):
-            query = query + " SET a.%(variable)s = '%(value)s'" % {"variable": variable, "value": value}
-        else:
-            value_list = value
-            quoted_values = ""
-            for value in value_list:
-                quoted_values += f"'{value}', "
-            quoted_values = quoted_values.strip(", ")
-            query += " SET a.%(variable)s = [%(quoted_values)s]" % {"variable": variable, "quoted_values": quoted_values}
-    tx.run(query)
+    query = f"MATCH (a:{_quote_identifier(type)} {{name: $name}}) SET a += $properties"
+    properties = {variable: [str(v) for v in value] if isinstance(value, list) else str(value) for (variable, value) in var_val_dict.items()}
+    tx.run(query, name=name, properties=properties)
 
 def set_element_label(tx, type: str, name: str, var_val_dict: dict):
-    query = "MATCH (a)-[r:%(type)s {name:'%(name)s'}]->(b)" % {"type": type, "name": name}
-    for (variable, value) in list(var_val_dict.items()):
-        if not isinstance(value, list):
-            query = query + " SET r.%(variable)s = '%(value)s'" % {"variable": variable, "value": value}
-        else:
-            value_list = value
-            quoted_values = ""
-            for value in value_list:
-                quoted_values += f"'{value}', "
-            quoted_values = quoted_values.strip(", ")
-            query += " SET r.%(variable)s = [%(quoted_values)s]" % {"variable": variable, "quoted_values": quoted_values}
-    tx.run(query)
+    query = f"MATCH (a)-[r:{_quote_identifier(type)} {{name: $name}}]->(b) SET r += $properties"
+    properties = {variable: [str(v) for v in value] if isinstance(value, list) else str(value) for (variable, value) in var_val_dict.items()}
+    tx.run(query, name=name, properties=properties)
+
+def _label_value_json(variable: str, value, string_key: str) -> str:
+    """
+    Get the JSON-like string stored for a single label value: kind_to_json() for kinds, {string_key: value} for strings.
+
+    Args:
+        variable (str): label name, for the message printed if the value is not supported
+        value: Kind or string
+        string_key (str): key of string values, as stored
+
+    Returns:
+        str: string to be stored, or None if the datatype of value is not supported
+    """
+    if isinstance(value, Kind):
+        return kind_to_json(value)
+    elif isinstance(value, str):
+        return f"{{{string_key}: {value}}}"
+    print(f"Unable to add label {variable}, label datatype not supported")
+    return None
 
 def add_type_label(tx, name: str, var_val_tuple: tuple):
     """Function to generate and run query for adding labels to types(nodes).
+    The value is passed as a query parameter; only the label name is part of the query.
 
     Args:
         tx (transaction): database transaction
@@ -159,78 +434,36 @@ def add_type_label(tx, name: str, var_val_tuple: tuple):
         var_val_tuple (tuple): tuple of variable(label name) and value(label)
     """
     variable, values = var_val_tuple[0], var_val_tuple[1]
-    query = """MATCH (%(name)s {name:'%(name)s'})""" % {"name": name}
-    
     if isinstance(values, list):
-        if len(values) != 0:
-            value_list_string = ""
-            for value in values:
-                if isinstance(value, Kind):
-                    value_json = kind_to_json(value)
-                elif isinstance(value, str):
-                    value_json = """{'string': %(value)s}""" % {"value": value}
-                else:
-                    print("Unable to add label %(label)s, label datatype not supported" % {'label': variable})
-                value_list_string = value_list_string \
-                                        + "%(value_json)s" % {"value_json": value_json} \
-                                        + ", "
-            value_list_string = value_list_string.strip(", ")
-            value_list_json = """ {'list': [%(value_list_string)s] } """ % {"value_list_string": value_list_string}
-            query += """ SET %(name)s.%(var)s = "%(value_list_json)s" """ % {"name": name, "var": variable, "value_list_json": value_list_json}
         if len(values) == 0:
-            query += """ RETURN %(name)s""" % {"name": name} #do nothing
-    elif isinstance (values, Kind):
-        value_json = kind_to_json(values)
-        query += """ SET %(name)s.%(var)s = "%(value)s" """ % {"name": name, "var": variable, "value": value_json}
-    elif isinstance(values, str):
-        value_type = 'string'
-        value_name = values
-        value_json = '{%(value_type)s: %(value_name)s}' % {"value_type": value_type, "value_name": value_name}
-        query += """ SET %(name)s.%(var)s = "%(value)s" """ % {"name": name, "var": variable, "value": value_json}
+            return
+        value_jsons = (_label_value_json(variable, value, "'string'") for value in values)
+        value = f" {{'list': [{', '.join(value_json for value_json in value_jsons if value_json is not None)}] }} "
     else:
-        print("Unable to add label, label datatype not supported")
-    tx.run(query)
+        value = _label_value_json(variable, values, "string")
+        if value is None:
+            return
+    query = f"MATCH (a {{name: $name}}) SET a.{_quote_identifier(variable)} = $value"
+    tx.run(query, name=name, value=value)
 
 def add_element_label(tx, name: str, var_val_tuple: tuple):
     """Function to generate and run query for adding labels to elements(edges/relationships).
+    The value is passed as a query parameter; only the label name is part of the query.
 
     Args:
         tx (transaction): database transaction
         name (str): Name of element 
         var_val_tuple (tuple): tuple of variable(label name) and value(label value)
     """
-    query = """MATCH (a)-[%(name)s {name: '%(name)s'}]->(b)""" % {"name": name}
     variable, values = var_val_tuple[0], var_val_tuple[1]
     if isinstance(values, list):
-        if len(values) != 0:
-            value_list_string = ""
-            for value in values:
-                if isinstance(value, Kind):
-                    value_json = kind_to_json(value)
-                elif isinstance(value, str):
-                    value_json = """{"string": %(value)s}""" % {"value": value}
-                else:
-                    print("Unable to add label, label datatype not supported")
-                value_list_string = value_list_string \
-                                        + "%(value_json)s" % {"value_json": value_json} \
-                                        + ", "
-            value_list_string = value_list_string.strip(", ")
-            query += """ SET %(name)s.%(var)s = ["%(value_list_string)s"]""" % {"name": name, "var": variable, "value_list_string": value_list_string}
-            print(query)
         if len(values) == 0:
-            query += """ RETURN %(name)s""" % {"name": name} #do nothing
-    elif isinstance (values, Kind):
-        value_json = kind_to_json(values)
-        query += """ SET %(name)s.%(var)s = '%(value)s'""" % {"name": name, "var": variable, "value": value_json}
-    elif isinstance(values, str):
-        value_type = 'string'
-        value_name = values
-        value_json = '{%(value_type)s: %(value_name)s}' % {"value_type": value_type, "value_name": value_name}
-        query += """ SET %(name)s.%(var)s = "%(value)s" """ % {"name": name, "var": variable, "value": value_json}
+            return
+        value_jsons = (_label_value_json(variable, value, '"string"') for value in values)
+        value = [", ".join(value_json for value_json in value_jsons if value_json is not None)]
     else:
-        print("Unable to add label, label datatype not supported")
-    tx.run(query)
-
-
-
-    
\ No newline at end of file
+        value = _label_value_json(variable, values, "string")
+        if value is None:
+            return
+    query = f"MATCH (a)-[r {{name: $name}}]->(b) SET r.{_quote_identifier(variable)} = $value"
+    tx.run(query, name=name, value=value)
@@ -6,345 +6,367 @@ Created on Thu Jun 22 12:35:16 2021
 @author: tgelsema
 """
 
+import sys
 from farseer.kind.knd import Application, Operator, Variable, Constant, ObjectTypeRelation, Phenomenon
 
+# Condition, Dimension, Subject and Denominator are not changed after construction, so their repr and hash
+# are computed once, on first use, and kept in _repr and _hash. Many of them are made per question, so they have __slots__
+# instead of an instance __dict__.
+# Kinds are normally unique per name, so equality first tests the identity of the kinds before comparing their
+# (interned, see Kind.__init__) names.
 class Condition():
+    __slots__ = ("var", "rels", "const", "_repr", "_hash")
+
     def __init__(self, var, rels, const):
         self.var = var
         self.rels = rels
         self.const = const
+        self._repr = None
+        self._hash = None
         
     def __repr__(self):
-        attrstring = ""
-        for rel in self.rels:
-            attrstring += " van een " + rel.domain.name
-        return self.var.name + " van een " + self.var.domain.name + attrstring + " = " + self.const.name
+        if self._repr is None:
+            self._repr = "".join([self.var.name, " van een ", self.var.domain.name] + [" van een " + rel.domain.name for rel in self.rels] + [" = ", self.const.name])
+        return self._repr
         
     def __eq__(self, other):
         if isinstance(other, Condition):
-            return self.var.name == other.var.name and self.rels == other.rels and self.const.name == other.const.name
+            return (self.var is other.var or self.var.name == other.var.name) and self.rels == other.rels and (self.const is other.const or self.const.name == other.const.name)
         else:
             return False
             
     def __hash__(self):
-        return hash(self.__repr__())
+        if self._hash is None:
+            self._hash = hash(self.__repr__())
+        return self._hash
         
 class Dimension():
+    __slots__ = ("var", "_repr", "_hash")
+
     def __init__(self, var):
         self.var = var
+        self._repr = None
+        self._hash = None
         
     def __repr__(self):
-        return "per " + self.var.name
+        if self._repr is None:
+            self._repr = "per " + self.var.name
+        return self._repr
         
     def __eq__(self, other):
         if isinstance(other, Dimension):
-            return self.var.name == other.var.name
+            return self.var is other.var or self.var.name == other.var.name
         else:
             return False
             
     def __hash__(self):
-        return hash(self.__repr__())
+        if self._hash is None:
+            self._hash = hash(self.__repr__())
+        return self._hash
         
 class Subject():
+    __slots__ = ("var", "rels", "_repr", "_hash")
+
     def __init__(self, var, rels):
         self.var = var
         self.rels = rels
+        self._repr = None
+        self._hash = None
         
     def __repr__(self):
-        if self.var.name.startswith("een"):
-            return self.var.domain.altname
-        else:
-            attrstring = ""
-            for rel in self.rels:
-                attrstring += " van een " + rel.domain.name
-            return self.var.name + " van een " + self.var.domain.name + attrstring
+        if self._repr is None:
+            if self.var.name.startswith("een"):
+                self._repr = self.var.domain.altname
+            else:
+                self._repr = "".join([self.var.name, " van een ", self.var.domain.name] + [" van een " + rel.domain.name for rel in self.rels])
+        return self._repr
         
     def __eq__(self, other):
         if isinstance(other, Subject):
-            return self.var.name == other.var.name and self.rels == other.rels
+            return (self.var is other.var or self.var.name == other.var.name) and self.rels == other.rels
         else:
             return False
             
     def __hash__(self):
-        return hash(self.__repr__())
+        if self._hash is None:
+            self._hash = hash(self.__repr__())
+        return self._hash
         
 class Denominator():
+    __slots__ = ("var", "_repr", "_hash")
+
     def __init__(self, var):
         self.var = var
+        self._repr = None
+        self._hash = None
         
     def __repr__(self):
-        if self.var.name.startswith("een"):
-            return self.var.domain.name
-        else:
-            return self.var.name + " van een " + self.var.domain.name
+        if self._repr is None:
+            if self.var.name.startswith("een"):
+                self._repr = self.var.domain.name
+            else:
+                self._repr = self.var.name + " van een " + self.var.domain.name
+        return self._repr
             
     def __eq__(self, other):
         if isinstance(other, Denominator):
-            return self.var.name == other.var.name
+            return self.var is other.var or self.var.name == other.var.name
         else:
             return False
             
     def __hash__(self):
-        return hash(self.__repr__())
+        if self._hash is None:
+            self._hash = hash(self.__repr__())
+        return self._hash
+
+# Handler of each class of question, see inform(). Per class: whether the dimensions and the denominators of the term are
+# needed, and a function making the report from (cls, conditions, dimensions, subjects, denominators, order).
+_HANDLERS = {
+    1: (False, False, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls1(conditions, subjects)),
+    2: (True, False, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls2and3and4(cls, conditions, dimensions, subjects)),
+    3: (True, False, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls2and3and4(cls, conditions, dimensions, subjects)),
+    4: (True, False, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls2and3and4(cls, conditions, dimensions, subjects)),
+    5: (True, True, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls5(conditions, dimensions, subjects, denominators)),
+    6: (True, False, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls6(conditions, dimensions, subjects, order)),
+    7: (True, False, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls7(conditions, dimensions, subjects, order)),
+    8: (True, False, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls8and9(cls, conditions, dimensions, subjects, order)),
+    9: (True, False, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls8and9(cls, conditions, dimensions, subjects, order)),
+    10: (False, False, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls10(conditions, subjects, order)),
+    11: (True, True, lambda cls, conditions, dimensions, subjects, denominators, order: informforcls11(conditions, dimensions, subjects, denominators, order)),
+}
 
 def inform(term, cls, result, order):
-    report = ([], [], [])
-    conditions = set()
-    extractconditions(term, conditions)
-    dimensions = set()
-    extractdimensions(term, dimensions)
-    rels = []
-    subjects = []
-    extractsubjects(term, subjects, rels)
-    if cls == 1:
-        report = informforcls1(conditions, subjects)
-    elif cls == 2 or cls == 3 or cls == 4:
-        report = informforcls2and3and4(cls, conditions, dimensions, subjects)
-    elif cls == 5:
-        denominators = set()
-        extractdenominators(term, denominators)
-        report = informforcls5(conditions, dimensions, subjects, denominators)
-    elif cls == 6:
-        report = informforcls6(conditions, dimensions, subjects, order)
-    elif cls == 7:
-        report = informforcls7(conditions, dimensions, subjects, order)
-    elif cls == 8:
-        report = informforcls8and9(cls, conditions, dimensions, subjects, order)
-    elif cls == 9:
-        report = informforcls8and9(cls, conditions, dimensions, subjects, order)
-    elif cls == 10:
-        report = informforcls10(conditions, subjects, order)
-    elif cls == 11:
-        denominators = set()
-        extractdenominators(term, denominators)
-        report = informforcls11(conditions, dimensions, subjects, denominators, order)
-    return report
+    if cls not in _HANDLERS:
+        return ([], [], [])
+    (needsdimensions, needsdenominators, handler) = _HANDLERS[cls]
+    (conditions, dimensions, subjects, denominators) = extractall(term, needsdimensions, needsdenominators)
+    return handler(cls, conditions, dimensions, subjects, denominators, order)
 
 def informforcls1(conditions, subjects):
-    return (makelistreport(subjects), [], makelistreport(list(conditions)))
+    return (makelistreport(subjects), [], list(conditions))
     
 def makelistreport(l):
-    rprtlst = []
-    i = 0
-    while i < len(l):
-        rprtlst.append(l[i].__repr__())
-        i += 1
-    return rprtlst
+    return [repr(x) for x in l]
 
 def informforcls2and3and4(cls, conditions, dimensions, subjects):
     subjreport = ""
     if subjects != []:
+        subject = subjects[0]
         if cls == 2:
-            subjreport = "aantal " + subjects[0].__repr__()
-        if cls == 3:
-            if subjects[0].var.article == "het":
-                subjreport += "totaal "
-            else:
-                subjreport += "totale "
-            subjreport += subjects[0].__repr__()
-        if cls == 4:
-            if subjects[0].var.article == "het":
-                subjreport += "gemiddeld "
-            else:
-                subjreport += "gemiddelde "
-            subjreport += subjects[0].__repr__()
-    return ([subjreport], makelistreport(list(dimensions)), makelistreport(list(conditions)))
+            subjreport = "aantal " + repr(subject)
+        elif cls == 3:
+            subjreport = ("totaal " if subject.var.article == "het" else "totale ") + repr(subject)
+        elif cls == 4:
+            subjreport = ("gemiddeld " if subject.var.article == "het" else "gemiddelde ") + repr(subject)
+    return ([subjreport], list(dimensions), list(conditions))
     
 def informforcls5(conditions, dimensions, subjects, denominators):
     subjreport = ""
     if subjects != []:
-        subjreport += "gemiddeld aantal " + subjects[0].__repr__() + " per " + denominators.pop().__repr__()
-    return ([subjreport], makelistreport(list(dimensions)), makelistreport(list(conditions)))
+        subjreport = "".join(["gemiddeld aantal ", repr(subjects[0]), " per ", next(iter(denominators))])
+    return ([subjreport], list(dimensions), list(conditions))
     
+# In the functions below, only the first dimension is reported; it is taken from the dictionary without copying it to a list.
 def informforcls6(conditions, dimensions, subjects, order):
     subjreport = ""
-    d = list(dimensions)
+    dimension = next(iter(dimensions.values()), None)
     if subjects != [] and order != None:
-        if order == "asc":
-            subjreport += "de kleinste 5 "
-        else:
-            subjreport += "de grootste 5 "
-        if d != []:
-            subjreport += d[0].var.domain.altname
+        subject = subjects[0]
+        subjrepr = repr(subject)
+        parts = ["de kleinste 5 " if order == "asc" else "de grootste 5 "]
+        parts.append(dimension.var.domain.altname if dimension is not None else subject.var.domain.altname)
+        parts.append(" volgens ")
+        if subject.var.name.startswith("een") and dimension is not None:
+            parts += ["aantal ", subjrepr, " van een ", dimension.var.domain.name]
         else:
-            subjreport += subjects[0].var.domain.altname
-        subjreport += " volgens "
-        if subjects[0].var.name.startswith("een") and d != []:
-            subjreport += "aantal " + subjects[0].__repr__() + " van een " + d[0].var.domain.name
-        else:
-            subjreport += subjects[0].__repr__()
-    return ([subjreport], [], makelistreport(list(conditions)))
+            parts.append(subjrepr)
+        subjreport = "".join(parts)
+    return ([subjreport], [], list(conditions))
     
 def informforcls7(conditions, dimensions, subjects, order):
     subjreport = ""
-    d = list(dimensions)
-    if subjects != [] and order != None and d != []:
-        subjreport += "de 5 " + d[0].var.domain.altname
-        subjreport += " met het "
-        if order == "asc":
-            subjreport += "kleinste aantal "
-        else:
-            subjreport += "grootste aantal "
-        subjreport += subjects[0].var.domain.altname
-    return ([subjreport], [], makelistreport(list(conditions)))
+    dimension = next(iter(dimensions.values()), None)
+    if subjects != [] and order != None and dimension is not None:
+        subjreport = "".join(["de 5 ", dimension.var.domain.altname, " met het ",
+                              "kleinste aantal " if order == "asc" else "grootste aantal ", subjects[0].var.domain.altname])
+    return ([subjreport], [], list(conditions))
     
 def informforcls8and9(cls, conditions, dimensions, subjects, order):
     subjreport = ""
-    d = list(dimensions)
-    if subjects != [] and order != None and d != []:
-        subjreport += "de 5 " + d[0].var.domain.altname
-        subjreport += " met "
+    dimension = next(iter(dimensions.values()), None)
+    if subjects != [] and order != None and dimension is not None:
+        subject = subjects[0]
+        parts = ["de 5 ", dimension.var.domain.altname, " met "]
         if cls == 8:
-            subjreport += "in totaal "
+            parts.append("in totaal ")
         elif cls == 9:
-            subjreport += "gemiddeld "
-        subjreport += subjects[0].var.article
-        if order == "asc":
-            subjreport += " laagste "
-        else:
-            subjreport += " hoogste "
-        subjreport += subjects[0].__repr__()
-    return ([subjreport], [], makelistreport(list(conditions)))
+            parts.append("gemiddeld ")
+        parts += [subject.var.article, " laagste " if order == "asc" else " hoogste ", repr(subject)]
+        subjreport = "".join(parts)
+    return ([subjreport], [], list(conditions))
     
 def informforcls10(conditions, subjects, order):
     subjreport = ""
     if subjects != [] and order != None:
-        if len(subjects) > 1:
-            subjreport += "de 5 " + subjects[1].var.domain.altname
-        else:
-            subjreport += "de 5 " + subjects[0].var.domain.altname
-        subjreport += " met " + subjects[0].var.article
-        if order == "asc":
-            subjreport += " laagste "
-        else:
-            subjreport += " hoogste "
-        subjreport += subjects[0].__repr__()
-    return ([subjreport], [], makelistreport(list(conditions)))
+        subject = subjects[0]
+        counted = subjects[1] if len(subjects) > 1 else subject
+        subjreport = "".join(["de 5 ", counted.var.domain.altname, " met ", subject.var.article,
+                              " laagste " if order == "asc" else " hoogste ", repr(subject)])
+    return ([subjreport], [], list(conditions))
     
 def informforcls11(conditions, dimensions, subjects, denominators, order):
     subjreport = ""
-    d = list(dimensions)
-    if subjects != [] and order != None and d != []:
-        subjreport += "de 5 " + d[0].var.domain.altname
-        subjreport += " met gemiddeld het "
-        if order == "asc":
-            subjreport += "laagste aantal "
-        else:
-            subjreport += "hoogste aantal "
-        subjreport += subjects[0].__repr__() + " per " + denominators.pop().__repr__()
-    return ([subjreport], [], makelistreport(list(conditions)))
+    dimension = next(iter(dimensions.values()), None)
+    if subjects != [] and order != None and dimension is not None:
+        subjreport = "".join(["de 5 ", dimension.var.domain.altname, " met gemiddeld het ",
+                              "laagste aantal " if order == "asc" else "hoogste aantal ",
+                              repr(subjects[0]), " per ", next(iter(denominators))])
+    return ([subjreport], [], list(conditions))
        
-def extractconditions(term, conditions):
-    if isinstance(term, Application):
-        args = term.args
-        if term.op.name == 'inclusion':
-            i = 0
-            while i < len(args):
-                variables = set()
-                extractfreevariables(args[i], variables)
-                var = variables.pop()
-                rels = []
-                extractrels(args[i], rels)
-                constants = set()
-                extractconstants(args[i + 1], constants)
-                const = constants.pop()
-                conditions.add(Condition(var, rels, const))
-                i += 2
-        else:
-            for arg in args:
-                extractconditions(arg, conditions)
-                
+# Names of the operations the extract functions below look for. Names are compared with ==, which is a pointer comparison
+# for these interned strings; terms that were unpickled carry names that are equal, but not necessarily the same object.
+_COMPOSITION = sys.intern('composition')
+_INCLUSION = sys.intern('inclusion')
+_AGGREGATION = sys.intern('aggregation')
+_PRODUCT = sys.intern('product')
+_DIVISION = sys.intern('(/)')
+
+# True for the application of an operation with the given name and args that is a composition with the (/) operator,
+# i.e. a division of args[1].args[0] by args[1].args[1]
+def _is_division(name, args):
+    return name == _COMPOSITION and isinstance(args[0], Operator) and args[0].name == _DIVISION
+
+# Conditions, dimensions and denominators are collected in dictionaries keyed by their repr, which is what the reports show.
+# Items with the same report line are kept once, and the reports list them in the order they were found.
+
+# Walks of the term done by extractall(), as bits of a mask
+_CONDITIONS = 1
+_DIMENSIONS = 2
+_SUBJECTS = 4
+_DENOMINATORS = 8
+
+# Single walk of the term collecting its conditions, dimensions (if needsdimensions), subjects and denominators (if needsdenominators).
+# Each entry on the stack carries the mask of the walks that reach it, as these walks descend into different arguments of (/)
+# compositions, aggregations and inclusions. Every walk still visits its terms in its own order.
+def extractall(term, needsdimensions=True, needsdenominators=True):
+    conditions = {}
+    dimensions = {}
+    subjects = []
+    denominators = {}
+    walks = _CONDITIONS | _SUBJECTS
+    if needsdimensions:
+        walks |= _DIMENSIONS
+    if needsdenominators:
+        walks |= _DENOMINATORS
+    stack = [(term, walks, [])]
+    while stack:
+        (term, walks, rels) = stack.pop()
+        if isinstance(term, Application):
+            args = term.args
+            name = term.op.name
+            if _is_division(name, args):
+                children = []
+                if walks & _CONDITIONS:
+                    children += [(arg, _CONDITIONS, rels) for arg in args]
+                if walks & (_DIMENSIONS | _SUBJECTS):
+                    children.append((args[1].args[0], walks & (_DIMENSIONS | _SUBJECTS), rels))
+                if walks & _DENOMINATORS:
+                    children.append((args[1].args[1], _DENOMINATORS, rels))
+            elif name == _INCLUSION:
+                if walks & _CONDITIONS:
+                    i = 0
+                    while i < len(args):
+                        variables = set()
+                        extractfreevariables(args[i], variables)
+                        var = variables.pop()
+                        condrels = []
+                        extractrels(args[i], condrels)
+                        constants = set()
+                        extractconstants(args[i + 1], constants)
+                        const = constants.pop()
+                        condition = Condition(var, condrels, const)
+                        conditions.setdefault(repr(condition), condition)
+                        i += 2
+                children = [(arg, _DIMENSIONS, rels) for arg in args] if walks & _DIMENSIONS else []
+            elif name == _AGGREGATION:
+                if walks & _DIMENSIONS:
+                    extractfreedimensions(args[1], dimensions)
+                children = [(args[0], walks & (_CONDITIONS | _SUBJECTS | _DENOMINATORS), rels)]
+                if walks & _CONDITIONS:
+                    children += [(arg, _CONDITIONS, rels) for arg in args[1:]]
+            else:
+                if name == _COMPOSITION and walks & _SUBJECTS:
+                    rels = []
+                    extractinnerrels(term, rels)
+                children = [(arg, walks, rels) for arg in args]
+            stack.extend(child for child in reversed(children) if child[1])
+        elif isinstance(term, Variable):
+            if walks & _SUBJECTS:
+                subjects.append(Subject(term, rels))
+            if walks & _DENOMINATORS and not term.name.startswith("alle"):
+                denominator = Denominator(term)
+                denominators.setdefault(repr(denominator), denominator)
+    return (conditions, dimensions, subjects, denominators)
+
+# The extract functions below walk the term with an explicit stack instead of recursion. Arguments are pushed in reverse,
+# so that they are visited in the same (left to right, depth first) order as a recursive walk would.
 def extractrels(term, rels):
-    if isinstance(term, Application):
-        args = term.args
-        if term.op.name == 'composition' and isinstance(args[0], Operator) and args[0].name == '(/)':
-            extractrels(args[1].args[0], rels)
-        elif term.op.name != 'inclusion':
-            if term.op.name == 'aggregation':
-                extractrels(args[0], rels)
-            else:   
-                for arg in args:
-                    extractrels(arg, rels)
-    elif isinstance(term, ObjectTypeRelation):
-        rels.append(term)
+    stack = [term]
+    while stack:
+        term = stack.pop()
+        if isinstance(term, Application):
+            name = term.op.name
+            args = term.args
+            if _is_division(name, args):
+                stack.append(args[1].args[0])
+            elif name != _INCLUSION:
+                if name == _AGGREGATION:
+                    stack.append(args[0])
+                else:
+                    stack.extend(reversed(args))
+        elif isinstance(term, ObjectTypeRelation):
+            rels.append(term)
                 
-def extractdimensions(term, dimensions):
-    if isinstance(term, Application):
-        args = term.args
-        if term.op.name == 'composition' and isinstance(args[0], Operator) and args[0].name == '(/)':
-            extractdimensions(args[1].args[0], dimensions)
-        elif term.op.name == 'aggregation':
-            extractfreedimensions(args[1], dimensions)
-        else:
-            for arg in args:
-                extractdimensions(arg, dimensions)
-
 def extractfreevariables(term, variables):
-    if isinstance(term, Application):
-        args = term.args
-        if term.op.name != 'inclusion':
-            for arg in args:
-                extractfreevariables(arg, variables)
-    elif isinstance(term, Variable):
-        if not term.name.startswith("alle"):
-            variables.add(term)
+    stack = [term]
+    while stack:
+        term = stack.pop()
+        if isinstance(term, Application):
+            if term.op.name != _INCLUSION:
+                stack.extend(reversed(term.args))
+        elif isinstance(term, Variable):
+            if not term.name.startswith("alle"):
+                variables.add(term)
             
-def extractfreedimensions(term, variables):
-    if isinstance(term, Application):
-        args = term.args
-        if term.op.name != 'inclusion':
-            for arg in args:
-                extractfreedimensions(arg, variables)
-    elif isinstance(term, Variable):
-        if not term.name.startswith("alle"):
-            variables.add(Dimension(term))
+def extractfreedimensions(term, dimensions):
+    stack = [term]
+    while stack:
+        term = stack.pop()
+        if isinstance(term, Application):
+            if term.op.name != _INCLUSION:
+                stack.extend(reversed(term.args))
+        elif isinstance(term, Variable):
+            if not term.name.startswith("alle"):
+                dimension = Dimension(term)
+                dimensions.setdefault(repr(dimension), dimension)
 
 def extractconstants(term, constants):
-    if isinstance(term, Application):
-        args = term.args
-        for arg in args:
-            extractconstants(arg, constants)
-    elif isinstance(term, Constant):
-        constants.add(term)
+    stack = [term]
+    while stack:
+        term = stack.pop()
+        if isinstance(term, Application):
+            stack.extend(reversed(term.args))
+        elif isinstance(term, Constant):
+            constants.add(term)
         
-def extractsubjects(term, subjects, rels):
-    if isinstance(term, Application):
-        args = term.args
-        if term.op.name == 'composition' and isinstance(args[0], Operator) and args[0].name == '(/)':
-            extractsubjects(args[1].args[0], subjects, rels)
-        elif term.op.name != 'inclusion':
-            if term.op.name == 'aggregation':
-                extractsubjects(args[0], subjects, rels)
-            else:
-                if term.op.name == 'composition':
-                    rels = []
-                    extractinnerrels(term, rels)
-                for arg in args:
-                    extractsubjects(arg, subjects, rels)
-    elif isinstance(term, Variable):
-        subjects.append(Subject(term, rels))
-                
 def extractinnerrels(term, rels):
-    if isinstance(term, Application):
-        args = term.args
-        if term.op.name != 'inclusion' and term.op.name != 'product':
-            for arg in args:
-                extractinnerrels(arg, rels)
-    elif isinstance(term, ObjectTypeRelation):
-        if term not in rels:
-            rels.append(term)
-
-def extractdenominators(term, denominators):
-    if isinstance(term, Application):
-        args = term.args
-        if term.op.name == 'composition' and isinstance(args[0], Operator) and args[0].name == '(/)':
-            extractdenominators(args[1].args[1], denominators)
-        elif term.op.name != 'inclusion':
-            if term.op.name == 'aggregation':
-                extractdenominators(args[0], denominators)
-            else:
-                for arg in args:
-                    extractdenominators(arg, denominators)
-    elif isinstance(term, Variable) and not term.name.startswith("alle"):
-        denominators.add(Denominator(term))
- 
\ No newline at end of file
+    stack = [term]
+    while stack:
+        term = stack.pop()
+        if isinstance(term, Application):
+            name = term.op.name
+            if name != _INCLUSION and name != _PRODUCT:
+                stack.extend(reversed(term.args))
+        elif isinstance(term, ObjectTypeRelation):
+            if term not in rels:
+                rels.append(term)
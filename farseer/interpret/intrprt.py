@@ -24,79 +24,151 @@ In all other cases, a single term is returned.
 from farseer.interpret.intrprt_iota import getiota, getkappa, getiotapaths, makeiota
 from farseer.interpret.intrprt_pivot import getpivot, getpseudodimension, getnexttarget
 from farseer.interpret.intrprt_dims import getdimensionpaths, appendvariablestopaths
-from farseer.interpret.intrprt_base import een, alle, makecomposition, makeproduct, makealpha, makeprojectioneasy, align
+from farseer.interpret.intrprt_base import een, alle, makecomposition, makecompositions, makeproduct, makealpha, makeprojectioneasy, align
 from farseer.interpret.intrprt_split import getsplit, getsplitfromkappa, getsplitfromobjectlist
-from farseer.interpret.intrprt_vars import getpathstonumvars, getpathstocatvars, getpathstoobjecttypes, getpathfromvar
+from farseer.interpret.intrprt_vars import getpathstovariables, getpathfromvar
 from farseer.graphdb.dm import gedeelddoor, defaults, orderedobjecttype
 from farseer.term.trm import InvalidApplication
-from farseer.graphdb.graphdb import graph
+from farseer.graphdb.graphdb import get_graph
+from functools import cached_property
+import sys
+from itertools import chain, islice
+
+class _Request:
+    """The information on a request that is shared by the handlers of the
+    classes in interpret(). The variables and object types the request
+    refers to, the iota term and the order are computed on first use only,
+    as not every class needs all of them. Note that handlers must access these
+    before insertpseudodimension() changes objectlist, keywordlist and
+    tokenlist. The paths to the variables and object types are found in a
+    single pass over objectlist, for the keywords in pathkeywords only.
+    """
+    def __init__(self, tokenlist, objectlist, keywordlist, target, pivot, pathkeywords):
+        self.tokenlist = tokenlist
+        self.objectlist = objectlist
+        self.keywordlist = keywordlist
+        self.target = target
+        self.pivot = pivot
+        self.pathkeywords = pathkeywords
+
+    @cached_property
+    def paths(self):
+        return getpathstovariables(self.objectlist, self.keywordlist, self.pivot, self.target, self.pathkeywords)
+
+    @cached_property
+    def numvars(self):
+        return makecompositions(self.paths['<numvar>'])
+
+    @cached_property
+    def classvars(self):
+        return makecompositions(self.paths['<catvar>'])
+
+    @cached_property
+    def otypes(self):
+        return makecompositions(appendvariablestopaths(self.paths['<ot>']))
+
+    @cached_property
+    def iota(self):
+        return getiota(self.objectlist, self.keywordlist, self.pivot, self.target)
+
+    @cached_property
+    def order(self):
+        return getorder(self.keywordlist)
+
+    @cached_property
+    def pathsfrompivot(self):
+        (pathsfrompivot, ignore) = getdimensionpaths(self.objectlist, self.keywordlist, self.pivot, self.target, None, {})
+        return pathsfrompivot
+
+    def getkappa(self, paths):
+        return getkappa(self.objectlist, self.keywordlist, self.pivot, self.target, self.iota, paths, None)
+
+def _hasnopseudodimension(r):
+    """Return True if the handlers for class 7 - 11 requests will return None
+    for lack of a pseudodimension, before anything is computed for them.
+    """
+    return getnexttarget(r.objectlist, r.keywordlist) == None
+
+def _interpretclass1(r):
+    return assembletermforclass1(r.target, r.numvars, r.classvars, r.otypes, r.getkappa([]), True)
+
+def _interpretclass2(r):
+    return assembletermforclass2and3(r.objectlist, r.keywordlist, r.pivot, r.target, r.pathsfrompivot, [], r.iota, None)
+
+def _interpretclass3(r):
+    return assembletermforclass2and3(r.objectlist, r.keywordlist, r.pivot, r.target, r.pathsfrompivot, r.numvars, r.iota, None)
+
+def _interpretclass4(r):
+    return assembletermforclass4(r.objectlist, r.keywordlist, r.pivot, r.target, r.pathsfrompivot, r.numvars, r.iota)
+
+def _interpretclass5(r):
+    return assembletermforclass5(r.objectlist, r.keywordlist, r.pivot, r.target, r.pathsfrompivot, r.getkappa(r.pathsfrompivot), [])
+
+def _interpretclass6(r):
+    if not getpseudodimension(r.objectlist, r.keywordlist) in orderedobjecttype.keys():
+        return None
+    return assembletermforclass6(r.objectlist, r.keywordlist, r.target, r.iota, r.order)
+
+def _interpretclass7(r):
+    if _hasnopseudodimension(r):
+        return None
+    return assembletermforclass7(r.objectlist, r.keywordlist, r.tokenlist, r.target, r.pivot, r.iota, r.order)
+
+def _interpretclass8(r):
+    if _hasnopseudodimension(r):
+        return None
+    return assembletermforclass8(r.objectlist, r.keywordlist, r.tokenlist, r.target, r.pivot, r.numvars, r.iota, r.order)
+
+def _interpretclass9(r):
+    if _hasnopseudodimension(r):
+        return None
+    return assembletermforclass9(r.objectlist, r.keywordlist, r.tokenlist, r.target, r.pivot, r.numvars, r.iota, r.order)
+
+def _interpretclass10(r):
+    if _hasnopseudodimension(r):
+        return None
+    return assembletermforclass10(r.objectlist, r.keywordlist, r.tokenlist, r.target, r.numvars, r.otypes, r.getkappa([]), r.order)
+
+def _interpretclass11(r):
+    if _hasnopseudodimension(r):
+        return None
+    return assembletermforclass11(r.objectlist, r.keywordlist, r.tokenlist, r.target, r.pivot, r.getkappa([]), r.order)
+
+# The handler for each class of request, together with the keywords of the
+# variables and object types it needs paths to, see interpret()
+_CLASS_HANDLERS = {1: (_interpretclass1, ('<numvar>', '<catvar>', '<ot>')), 2: (_interpretclass2, ()),
+                   3: (_interpretclass3, ('<numvar>',)), 4: (_interpretclass4, ('<numvar>',)), 5: (_interpretclass5, ()),
+                   6: (_interpretclass6, ()), 7: (_interpretclass7, ()), 8: (_interpretclass8, ('<numvar>',)),
+                   9: (_interpretclass9, ('<numvar>',)), 10: (_interpretclass10, ('<numvar>', '<ot>')),
+                   11: (_interpretclass11, ())}
 
 def interpret(tokenlist, objectlist, keywordlist, target, cls):
     """From the output of the first stage of Farseer, i.e., the lists
     tokenlist, objectlist and keywordlist that are the result of the
     tokenize routine, together with the estimated class of a request (cls) and
     the estimated target, compute a term that forms the semantics of the
-    request. After computing the pivot and some general purpose information,
-    divert the computation of the term to one of several routines, according
-    to the 11 classes currently considered.
+    request. Unless the class is unknown, compute the pivot and divert the computation of the term to
+    the handler in _CLASS_HANDLERS for one of the 11 classes currently
+    considered. General purpose information on the request is computed only
+    when the handler needs it (see _Request).
     Note that the output of interpret can be a single term, or a list
     consisting of a term, a variable that is the subject of ordering, and an
     indication of order ('asc' or 'desc').
     """
+    if not cls in _CLASS_HANDLERS:
+        return None
+    (handler, pathkeywords) = _CLASS_HANDLERS[cls]
     pivot = getpivot(objectlist, keywordlist)
     if pivot == None:
         return None
-    if not pivot.equals(target):
-        if graph.get_paths(pivot, target) == []:
+    if pivot is not target and not pivot.equals(target):
+        if not get_graph().has_path(pivot, target):
             return None
-    pathstonumvars = getpathstonumvars(objectlist, keywordlist, target)
-    pathstoclassvars = getpathstocatvars(objectlist, keywordlist, target)
-    pathstootypes = getpathstoobjecttypes(objectlist, keywordlist, pivot, target)
-    pathstootypes = appendvariablestopaths(pathstootypes)
-    order = getorder(keywordlist)
-    numvars = []
-    classvars = []
-    otypes = []
-    for path in pathstonumvars:
-        numvars.append(makecomposition(path))
-    for path in pathstoclassvars:
-        classvars.append(makecomposition(path))
-    for path in pathstootypes:
-        otypes.append(makecomposition(path))
-    iota = getiota(objectlist, keywordlist, pivot, target)
-    if cls == 1:
-        kappa = getkappa(objectlist, keywordlist, pivot, target, iota, [], None)
-        return assembletermforclass1(target, numvars, classvars, otypes, kappa, True)
-    elif cls == 2:
-        (pathsfrompivot, ignore) = getdimensionpaths(objectlist, keywordlist, pivot, target, None, {})
-        return assembletermforclass2and3(objectlist, keywordlist, pivot, target, pathsfrompivot, [], iota, None)
-    elif cls == 3:
-        (pathsfrompivot, ignore) = getdimensionpaths(objectlist, keywordlist, pivot, target, None, {})
-        return assembletermforclass2and3(objectlist, keywordlist, pivot, target, pathsfrompivot, numvars, iota, None)
-    elif cls == 4:
-        (pathsfrompivot, ignore) = getdimensionpaths(objectlist, keywordlist, pivot, target, None, {})
-        return assembletermforclass4(objectlist, keywordlist, pivot, target, pathsfrompivot, numvars, iota)
-    elif cls == 5:
-        (pathsfrompivot, ignore) = getdimensionpaths(objectlist, keywordlist, pivot, target, None, {})
-        kappa = getkappa(objectlist, keywordlist, pivot, target, iota, pathsfrompivot, None)
-        return assembletermforclass5(objectlist, keywordlist, pivot, target, pathsfrompivot, kappa, [])
-    elif cls == 6:
-        return assembletermforclass6(objectlist, keywordlist, target, iota, order)
-    elif cls == 7:
-        return assembletermforclass7(objectlist, keywordlist, tokenlist, target, pivot, iota, order)
-    elif cls == 8:
-        return assembletermforclass8(objectlist, keywordlist, tokenlist, target, pivot, numvars, iota, order)
-    elif cls == 9:
-        return assembletermforclass9(objectlist, keywordlist, tokenlist, target, pivot, numvars, iota, order)
-    elif cls == 10:
-        kappa = getkappa(objectlist, keywordlist, pivot, target, iota, [], None)
-        return assembletermforclass10(objectlist, keywordlist, tokenlist, target, numvars, otypes, kappa, order)
-    elif cls == 11:
-        kappa = getkappa(objectlist, keywordlist, pivot, target, iota, [], None)
-        return assembletermforclass11(objectlist, keywordlist, tokenlist, target, pivot, kappa, order)
-    elif cls == 0:
-        return None
-    return None
+    return handler(_Request(tokenlist, objectlist, keywordlist, target, pivot, pathkeywords))
+
+# The order indicated by each keyword, see getorder()
+_ORDER_MAP = {sys.intern('<most>'): 'desc', sys.intern('<greatest>'): 'desc',
+              sys.intern('<least>'): 'asc', sys.intern('<smallest>'): 'asc'}
 
 def getorder(keywordlist):
     """Simple routine to detect whether '<most>' or '<greatest>' occurs in
@@ -104,14 +176,12 @@ def getorder(keywordlist):
     '<smallest>' occurs in keywordlist, in which case 'asc' is returned. When
     neither occurs in keywordlist, return ''.
     """
-    i = 0
-    while i < len(keywordlist):
-        if keywordlist[i] == '<most>' or keywordlist[i] == '<greatest>':
-            return 'desc'
-        if keywordlist[i] == '<least>' or keywordlist[i] == '<smallest>':
-            return 'asc'
-        i += 1
-    return ''
+    return next((_ORDER_MAP[keyword] for keyword in keywordlist if keyword in _ORDER_MAP), '')
+
+# Keywords inserted by insertpseudodimension(), interned like those from the
+# tokenizer (see farseer.nlp.tknz.tokenize())
+_PER = sys.intern('<per>')
+_OT = sys.intern('<ot>')
 
 def insertpseudodimension(objectlist, keywordlist, tokenlist, pseudodimension):
     """For class 7 - 11 queries, say of the form
@@ -127,20 +197,18 @@ def insertpseudodimension(objectlist, keywordlist, tokenlist, pseudodimension):
     'griffier' say) the words 'per persoon' are inserted at the end of
     tokenlist.
     """
-    i = 0
-    while i < len(keywordlist) and objectlist[i] != pseudodimension:
-        i += 1
-    if i != len(keywordlist):
-        keywordlist.insert(i, '<per>')
-        objectlist.insert(i, None)
-        tokenlist.insert(i, 'per')
+    n = len(keywordlist)
+    i = next((j for (j, obj) in enumerate(islice(objectlist, n)) if obj is pseudodimension), n)
+    # the lists are changed in place (callers inspect them after interpret()),
+    # but each with a single slice assignment
+    if i != n:
+        keywordlist[i:i] = [_PER]
+        objectlist[i:i] = [None]
+        tokenlist[i:i] = ['per']
     else:
-        keywordlist.insert(i, '<per>')
-        keywordlist.insert(i + 1, '<ot>')
-        objectlist.insert(i, None)
-        objectlist.insert(i + 1, pseudodimension)
-        tokenlist.insert(i, 'per')
-        tokenlist.insert(i + 1, pseudodimension.__repr__())
+        keywordlist[i:i] = [_PER, _OT]
+        objectlist[i:i] = [None, pseudodimension]
+        tokenlist[i:i] = ['per', pseudodimension.__repr__()]
     return (objectlist, keywordlist, tokenlist)
 
 def assembletermforclass11(objectlist, keywordlist, tokenlist, target, pivot, kappa, order):
@@ -174,7 +242,7 @@ def assembletermforclass10(objectlist, keywordlist, tokenlist, target, numvars,
     if pseudodimension == None:
         return None
     includetargetdefaults = False
-    if pseudodimension == target:
+    if pseudodimension is target:
         includetargetdefaults = True
     return [assembletermforclass1(target, numvars, [], otypes, kappa, includetargetdefaults), numvars[0], order]
 
@@ -271,21 +339,14 @@ def assembletermforclass1(target, numvars, classvars, otypes, kappa, includetarg
     depending on whether or not pivot equals target. Return the resulting term
     thus constructed.
     """
-    args = []
+    targetdefaults = []
     if includetargetdefaults:
-        if target in defaults.keys():
-            for d in defaults[target]:
-                if not d in args:
-                    args.append(d)
-    for n in numvars:
-        if not n in args:
-            args.append(n)
-    for c in classvars:
-        if not c in args:
-            args.append(c)
-    for o in otypes:
-        if not o in args:
-            args.append(o)
+        targetdefaults = defaults.get(target, [])
+    # terms compare by identity, so key on id() to drop duplicates in order
+    seen = {}
+    for arg in chain(targetdefaults, numvars, classvars, otypes):
+        seen.setdefault(id(arg), arg)
+    args = list(seen.values())
     if args != []:
         v = makeproduct(args)
     else:
@@ -339,20 +400,27 @@ def assembletermforclass2and3(objectlist, keywordlist, pivot, target, paths, num
           'het totale inkomen van werknemers in de zorg in Leiden'
     Only in the last example the general case applies.
     """
+    zw = _assemblezw(objectlist, keywordlist, pivot, target, paths, iota, split)
+    if zw == None:
+        return None
+    return _assemblealpha(pivot, target, numvars, iota, zw)
+
+def _assemblezw(objectlist, keywordlist, pivot, target, paths, iota, split):
+    """Return the pair (z, w) for the class 2 and class 3 terms built by
+    assembletermforclass2and3(), where z is None when pivot equals target, or
+    return None if kappa does not allow for the projections needed. As (z, w)
+    does not depend on the numerical variables, it can be shared by the terms
+    for, e.g., the numerator and the denominator in assembletermforclass4().
+    """
     # default case: assume pivot equals target and no selections or dimensions apply
     kappa = getkappa(objectlist, keywordlist, pivot, target, iota, paths, split)
-    if numvars != []:
-        v = makeproduct(numvars)
-    else:
-        v = een(target)
     w = alle(target)
     z = None
-    if iota != None and pivot == target:
+    if iota != None and pivot is target:
         w = makecomposition([w, iota]) 
-        v = makecomposition([v, iota])
     # the cases below are the ones in which kappa is critical
     i = 0
-    if pivot != target:
+    if pivot is not target:
         z = makeprojectioneasy(kappa, 1)
         w = makecomposition([w, z])
         i = 1
@@ -362,18 +430,28 @@ def assembletermforclass2and3(objectlist, keywordlist, pivot, target, paths, num
         if i == 0 and len(paths) == 1:
             w = kappa
         else:
-            j = 0
-            zs = []
-            while j < len(paths):
-                try:
-                    zs.append(makeprojectioneasy(kappa, i + 1))
-                except InvalidApplication: # something's wrong, perhaps due to a bad targetindex
-                    return None
-                i += 1
-                j += 1
+            try:
+                zs = [makeprojectioneasy(kappa, i + j + 1) for j in range(len(paths))]
+            except InvalidApplication: # something's wrong, perhaps due to a bad targetindex
+                return None
             w = makeproduct(zs)
+    return (z, w)
+
+def _assemblealpha(pivot, target, numvars, iota, zw):
+    """Complete the term a(v, w) of assembletermforclass2and3() for the
+    numerical variables numvars from the pair zw returned by _assemblezw(), or
+    return None if v does not fit z.
+    """
+    (z, w) = zw
+    if numvars != []:
+        v = makeproduct(numvars)
+    else:
+        v = een(target)
+    if iota != None and pivot is target:
+        v = makecomposition([v, iota])
     if z != None:
-        if v.type.args[0].equals(z.type.args[1]):
+        (domain, codomain) = (v.type.args[0], z.type.args[1])
+        if domain is codomain or domain.equals(codomain):
             v = makecomposition([v, z])
         else: # something's wrong, perhaps due to an error in estimation of target
             return None
@@ -401,8 +479,12 @@ def assembletermforclass4(objectlist, keywordlist, pivot, target, paths, numvars
         return None
     x = numvars[0]
     
-    z1 = assembletermforclass2and3(objectlist, keywordlist, pivot, target, paths, [x], iota, None)
-    z2 = assembletermforclass2and3(objectlist, keywordlist, pivot, target, paths, [], iota, None)
+    # nominator and denominator share kappa, z and w, so build these once
+    zw = _assemblezw(objectlist, keywordlist, pivot, target, paths, iota, None)
+    if zw == None:
+        return None
+    z1 = _assemblealpha(pivot, target, [x], iota, zw)
+    z2 = _assemblealpha(pivot, target, [], iota, zw)
 
     if z1 != None and z2 != None:
         return makecomposition([gedeelddoor, makeproduct([z1, z2])])
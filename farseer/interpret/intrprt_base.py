@@ -6,7 +6,7 @@ Created on Mon Feb  4 10:40:17 2019
 @author: tgelsema
 
 This package exposes many short routines used by the various interpret.intrprt
-packages. Notably the package exposes graph.get_paths() and getoptimalpath() that,
+packages. Notably the package exposes get_graph().get_paths() and getoptimalpath() that,
 respectively, return all paths from the knowledge graph, given two vertices,
 and select from them a path that is 'optimal' in some sense, given 'clues' and
 'hints', which act like 'pebbles' on a path.
@@ -22,10 +22,11 @@ latter is not safe, as equality of variables is based on their ID, so make
 sure they exist in the knowledge graph.)
 """
 
+from collections import Counter
 from farseer.graphdb.dm import whichway, getal, overridetarget, one
 from farseer.term.trm import Application, product, composition, cartesian_product, projection, alpha, inverse, inclusion
-from farseer.kind.knd import ObjectType, Variable
-from farseer.graphdb.graphdb import graph
+from farseer.kind.knd import Kind, ObjectType, Variable
+from farseer.graphdb.graphdb import get_graph
 
 def getdomainlist(term):
     """Return the arguments of a Cartesian product as a list, if the domain of
@@ -34,10 +35,10 @@ def getdomainlist(term):
     case, the domain is a Cartesian product (in contrast to a product: in that
     case the codomain is a Cartesian product).
     """
-    if isinstance(term.type.args[0], Application):
-        if term.type.args[0].op == cartesian_product:
-            return term.type.args[0].args
-    return [term.type.args[0]]
+    domain = term.type.args[0]
+    if isinstance(domain, Application) and domain.op is cartesian_product:
+        return domain.args
+    return [domain]
 
 def align(term1, term2):
     """Align term1 with term2 in the case in which:
@@ -53,31 +54,51 @@ def align(term1, term2):
         Some special attention is given in the case the domain of term1
         contains the type 'one': not sure though if align() is safe in these
         cases: perhaps rewrite when necessary.
+        Types are compared by identity, so the position of each type in the
+        domain of term2 is looked up in a dictionary keyed by id(), holding
+        its first occurrence.
     """
     t1domlist = getdomainlist(term1)
     t2domlist = getdomainlist(term2)
-    if t1domlist == t2domlist:
+    if len(t1domlist) == len(t2domlist) and all(d1 is d2 for (d1, d2) in zip(t1domlist, t2domlist)):
         return term1
+    t2positions = {}
+    for (i, d) in enumerate(t2domlist):
+        t2positions.setdefault(id(d), i + 1)
     args = []
     for d in t1domlist:
-        if d != one:
-            if not d in t2domlist:
+        if d is not one:
+            position = t2positions.get(id(d))
+            if position == None:
                 return None
             else:
-                args.append(makeprojection(t2domlist + [t2domlist.index(d) + 1]))
+                args.append(makeprojection(t2domlist + [position]))
         else:
             return makecomposition([term1, alle(makecartesianproduct(t2domlist))])
     return makecomposition([term1, makeproduct(args)])
 
 def isprefix(p, q):
-    """Return True iff the list p is a prefix of the list q.
+    """Return True iff the list p is a prefix of the list q. The last element
+    of p is compared first, so that most lists that differ are told apart
+    without taking a slice of q.
     """
-    return len(q) >= len(p) and q[:len(p)] == p
+    n = len(p)
+    if len(q) < n:
+        return False
+    if n > 0 and q[n - 1] != p[n - 1]:
+        return False
+    return q[:n] == p
 
 def ispostfix(p, q):
-    """Return True iff the list p is a postfix of the list q.
+    """Return True iff the list p is a postfix of the list q. As in isprefix(),
+    the first element of p is compared first, before taking a slice of q.
     """
-    return len(q) >= len(p) and q[len(q) - len(p):] == p
+    n = len(q) - len(p)
+    if n < 0:
+        return False
+    if len(p) > 0 and q[n] != p[0]:
+        return False
+    return q[n:] == p
 
 def getoptimalpath(paths, clues, hint):
     """From a list of paths (a list of lists) having common origin and common
@@ -94,26 +115,40 @@ def getoptimalpath(paths, clues, hint):
     Return the paths with the highest points awarded. If two paths score the
     same number of points, select the longest of the two (?).
     """
+    # equals() compares kinds by their ids: count the ids of the clues (and of
+    # the object types the clues refer to via overridetarget) once, so that an
+    # edge is scored by a few dictionary lookups instead of a pass over clues
+    clueids = Counter()
+    otypeids = Counter()
+    for clue in clues:
+        if isinstance(clue, Kind):
+            clueids[clue.id] += 1
+        if clue.kind == 'element' and clue.domain.equals(one):
+            otype = overridetarget.get(clue.codomain)
+            if isinstance(otype, Kind):
+                otypeids[otype.id] += 1
+    # the paths share most of their edges: score each edge once, and skip the
+    # lookups for clues (or override targets) when there are none
+    edgescores = {}
+    whichwayget = whichway.get
     optimalpath = []
     n = -1
     for path in paths:
-        if hint != []:
-            if isprefix(hint, path):
-                return path
+        if hint != [] and isprefix(hint, path):
+            return path
         k = 0
         for edge in path:
-            for clue in clues:
-                if edge.equals(clue):
-                    k += 10
-                if edge.domain.equals(clue) or edge.codomain.equals(clue):
-                    k += 4
-                if clue.kind == 'element' and clue.domain.equals(one) and clue.codomain in overridetarget.keys():
-                    otype = overridetarget[clue.codomain]
-                    if edge.domain.equals(otype) or edge.codomain.equals(otype):
-                        k += 2
-            if edge.domain in whichway.keys():
-                if edge == whichway[edge.domain]:
-                    k += 1
+            score = edgescores.get(id(edge))
+            if score == None:
+                score = 0
+                if clueids:
+                    score += 10 * clueids[edge.id] + 4 * countends(clueids, edge)
+                if otypeids:
+                    score += 2 * countends(otypeids, edge)
+                if whichwayget(edge.domain) is edge:
+                    score += 1
+                edgescores[id(edge)] = score
+            k += score
         if k > n:
             n = k
             optimalpath = path
@@ -121,6 +156,15 @@ def getoptimalpath(paths, clues, hint):
             optimalpath = path
     return optimalpath
 
+def countends(counts, edge):
+    """Return the number of times the domain or the codomain of edge is
+    counted in counts (a Counter of ids), counting both once if they are the
+    same.
+    """
+    if edge.domain.id == edge.codomain.id:
+        return counts[edge.domain.id]
+    return counts[edge.domain.id] + counts[edge.codomain.id]
+
 def makecomposition(args):
     """Make a composition term from the list of arguments args by calling
     term.Application(). Return None if args is empty and return args[0] if args
@@ -132,6 +176,12 @@ def makecomposition(args):
         return args[0]
     else:
         return Application(composition, args)
+
+def makecompositions(paths):
+    """Make a composition term, as by makecomposition(), from each path in the
+    list paths. Return the list of composition terms, in the order of paths.
+    """
+    return [makecomposition(path) for path in paths]
     
 def makeproduct(args):
     """Make a product term from the list of arguments args by calling
@@ -180,11 +230,10 @@ def makeprojectioneasy(arg, n):
     term (or rather: its codomain is a Cartesian product) and compose it with
     arg in that case. Otherwise, just return arg.
     """
-    if not isinstance(arg.type.args[1], Application):
+    codomain = arg.type.args[1]
+    if not isinstance(codomain, Application) or codomain.op is not cartesian_product:
         return arg
-    if arg.type.args[1].op != cartesian_product:
-        return arg
-    pargs = arg.type.args[1].args.copy()
+    pargs = codomain.args.copy()
     pargs.append(n)
     return makecomposition([makeprojection(pargs), arg])
     
@@ -206,14 +255,22 @@ def makeinclusion(args):
     else:
         return Application(inclusion, args)
     
-def terminlist(term, lst):
-    """Return True iff (a copy of) term is present in the list lst. As
-    matching criterium, use the string representation __repr__() of term.
+# The variables returned by een() and alle(), keyed by their names. Both are
+# emptied when the domainmodel of the graph is rebuilt, see _variablecaches()
+_eencache = {}
+_allecache = {}
+_cacheddm = None
+
+def _variablecaches(graph):
+    """Return the caches of een() and alle() after emptying them if the
+    domainmodel of graph is not the one their variables were taken from.
     """
-    for t in lst:
-        if t.__repr__() == term.__repr__():
-            return True
-    return False
+    global _cacheddm
+    if graph.rebuilt_dm is not _cacheddm:
+        _eencache.clear()
+        _allecache.clear()
+        _cacheddm = graph.rebuilt_dm
+    return (_eencache, _allecache)
 
 def een(p: ObjectType) -> Variable:
     """
@@ -228,13 +285,17 @@ def een(p: ObjectType) -> Variable:
         Variable: variable connecting objecttype p to 'getal'
     """
     title = "een(%s)" % p.name
-    een = graph.get_kind(title, 'Variable')
-    if een:
+    graph = get_graph()
+    eencache = _variablecaches(graph)[0]
+    een = eencache.get(title)
+    if een is not None:
         return een
-    else:
+    een = graph.get_kind(title, 'Variable')
+    if not een:
         een = Variable(name=title, domain=p, codomain=graph.getal)
         graph.rebuilt_dm.update({title: een})
-        return een
+    eencache[title] = een
+    return een
 
 def alle(p: ObjectType) -> Variable:
     """
@@ -248,45 +309,77 @@ def alle(p: ObjectType) -> Variable:
     Returns:
         Variable: alle(p)
     """
-    
     title = "alle(%s)" % p.__repr__()
-    a = graph.get_kind(title, 'Variable')
-    if a:
+    graph = get_graph()
+    allecache = _variablecaches(graph)[1]
+    a = allecache.get(title)
+    if a is not None:
         return a
-    else:
+    a = graph.get_kind(title, 'Variable')
+    if not a:
         a = Variable(name=title, domain=p, codomain=graph.one)
         graph.rebuilt_dm.update({title: a})
-        return Variable(name=title, domain=p, codomain=graph.one)
+    allecache[title] = a
+    return a
 
+def getunkindex(keywordlist):
+    """Return a pair of lists (forward, backward) of length len(keywordlist) + 1
+    such that forward[k] equals lookforward(k, keywordlist) and backward[k]
+    equals lookback(k, keywordlist) for each k from 0 up to len(keywordlist).
+    Both are computed in one sweep over keywordlist each, so that routines that
+    look for keywords around many indices (such as getcontext()) need not skip
+    the occurrences of '<unk>' over and over again.
+    """
+    n = len(keywordlist)
+    forward = [n + 1] * (n + 1)
+    nextk = n
+    for k in range(n - 1, -1, -1):
+        forward[k] = nextk
+        if keywordlist[k] != '<unk>':
+            nextk = k
+    backward = [-1] * (n + 1)
+    prevk = -1
+    for k in range(n + 1):
+        backward[k] = prevk
+        if k < n and keywordlist[k] != '<unk>':
+            prevk = k
+    return (forward, backward)
 
-def lookforward(k, keywordlist):
+def lookforward(k, keywordlist, unkindex=None):
     """In keywordlist at position k, return the index to the next keyword not
-    equal to '<unk>'. Return len(keywordlist) if no such keyword exists.
+    equal to '<unk>'. Return len(keywordlist) if no such keyword exists. If
+    given, use unkindex, as returned by getunkindex().
     """
+    if unkindex != None and 0 <= k < len(unkindex[0]):
+        return unkindex[0][k]
     n = k + 1
     while n < len(keywordlist) and keywordlist[n] == '<unk>':
         n += 1
     return n
 
-def lookback(k, keywordlist):
+def lookback(k, keywordlist, unkindex=None):
     """In keywordlist at position k, return the index to the previous keyword
-    not equal to '<unk>'. Return -1 if no such keyword exists.
+    not equal to '<unk>'. Return -1 if no such keyword exists. If given, use
+    unkindex, as returned by getunkindex().
     """
+    if unkindex != None and 0 <= k < len(unkindex[1]):
+        return unkindex[1][k]
     n = k - 1
     while n >= 0 and keywordlist[n] == '<unk>':
         n -= 1
     return n
 
-def getcontext(k, keywordlist):
+def getcontext(k, keywordlist, unkindex=None):
     """In keywordlist indexed by k, get the two keywords (not equal to '<unk>')
     in the keywordlist ahead of index k (if they exist) as well as the two
     keywords (not equal to '<unk>') before k (if they exist). Return a list of
-    the indices to these four keywords.
+    the indices to these four keywords. If given, use unkindex, as returned by
+    getunkindex(), to find these.
     """
-    f1 = lookforward(k, keywordlist)
-    f2 = lookforward(f1, keywordlist)
-    b1 = lookback(k, keywordlist)
-    b2 = lookback(b1, keywordlist)
+    f1 = lookforward(k, keywordlist, unkindex)
+    f2 = lookforward(f1, keywordlist, unkindex)
+    b1 = lookback(k, keywordlist, unkindex)
+    b2 = lookback(b1, keywordlist, unkindex)
     return [b2, b1, f1, f2]
 
 def getclueindexfrompattern(pattern, clueidx, context, keywordlist):
@@ -298,30 +391,14 @@ def getclueindexfrompattern(pattern, clueidx, context, keywordlist):
     indicating the position for k.
     """
     centeroffset = pattern.index('*')
-    match = True
-    patternidx = 0
-    pastcenter = 0
-    while match and patternidx < len(pattern):
+    offset = len(context) // 2 - centeroffset
+    n = len(keywordlist)
+    for patternidx in range(len(pattern)):
         if patternidx != centeroffset:
-            if context[patternidx + len(context) // 2 - centeroffset - pastcenter] == None:
-                match = False
-            elif context[patternidx + len(context) // 2 - centeroffset - pastcenter] >= len(keywordlist):
-                match = False
-            elif context[patternidx + len(context) // 2 - centeroffset - pastcenter] < 0:
-                match = False
-            elif pattern[patternidx] != keywordlist[context[patternidx + len(context) // 2 - centeroffset - pastcenter]]:
-                match = False  
-        else:
-            pastcenter = 1
-        patternidx += 1
-    if match:
-        if clueidx > centeroffset:
-            pastcenter = 1
-        else:
-            pastcenter = 0
-        return context[clueidx + len(context) // 2 - centeroffset - pastcenter]
-    else:
-        return -1
+            c = context[patternidx + offset - (patternidx > centeroffset)]
+            if c == None or c < 0 or c >= n or pattern[patternidx] != keywordlist[c]:
+                return -1
+    return context[clueidx + offset - (clueidx > centeroffset)]
     
 def getindexfrompattern(pattern, patternidx, index, keywordlist, discardunk):
     """Match the first occurrence of pattern in keywordlist starting at index
@@ -342,35 +419,39 @@ def match(pattern, patternidx, index, keywordlist, discardunk):
     return False. Discard occurrences of '<unk>' in keywordlist, except if
     keywordlist[index] == '<unk>': in that case, return False.
     """
-    foundindex = -1
-    if index >= len(keywordlist) or index < 0 or keywordlist[index] == '<unk>':
+    n = len(keywordlist)
+    if index >= n or index < 0 or keywordlist[index] == '<unk>':
         return -1
     if patternidx >= len(pattern) or patternidx < 0:
         return -1
-    i = index
-    j = 0
-    while j < len(pattern):
-        if i + j >= len(keywordlist) or i + j < 0:
-            return -1
-        if pattern[j] != keywordlist[i + j] and not discardunk:
-            return -1
-        if pattern[j] != keywordlist[i + j] and keywordlist[i + j] != '<unk>':
+    foundindex = -1
+    k = index
+    for j, key in enumerate(pattern):
+        while discardunk and k < n and keywordlist[k] == '<unk>':
+            k += 1
+        if k >= n or key != keywordlist[k]:
             return -1
         if j == patternidx:
-            foundindex = i + j
-        if keywordlist[i + j] == '<unk>' and discardunk:
-            i += 1
-        else:
-            j += 1
+            foundindex = k
+        k += 1
     return foundindex
 
 def insertsorted(lst, obj):
     """Insert into lst the argument obj, such that the list lst remains
     sorted. As sorting criterium use the string representation of obj,
     obtained by the .__repr__() method. Return the list lst with obj inserted.
+    As lst is sorted (in descending order, as are all lists built by
+    insertsorted()), the position of obj is found by bisection: obj goes in
+    front of the first element whose representation is not greater.
     """
-    i = 0
-    while i < len(lst) and lst[i].__repr__() > obj.__repr__():
-        i += 1
-    lst.insert(i, obj)
+    key = obj.__repr__()
+    lo = 0
+    hi = len(lst)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if lst[mid].__repr__() > key:
+            lo = mid + 1
+        else:
+            hi = mid
+    lst.insert(lo, obj)
     return lst
\ No newline at end of file
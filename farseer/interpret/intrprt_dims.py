@@ -15,11 +15,11 @@ suitable variables to the paths found in getdimensionpaths() to get true
 dimensions. These two are used in combination in the farseer.interpret.intrprt
 routines.
 """
-from farseer.interpret.intrprt_base import ispostfix, getindexfrompattern, insertsorted, getoptimalpath, makeproduct
+from farseer.interpret.intrprt_base import ispostfix, match, insertsorted, getoptimalpath, makeproduct
 from farseer.graphdb.dm import defaults
 from farseer.term.trm import Application
 from farseer.kind.knd import Variable
-from farseer.graphdb.graphdb import graph
+from farseer.graphdb.graphdb import get_graph
 
 def getdimensionpaths(objectlist, keywordlist, pivot, target, ignoresplit, hints):
     """Return two lists of paths. The first is a list of paths from pivot to
@@ -52,15 +52,22 @@ def getdimensionpaths(objectlist, keywordlist, pivot, target, ignoresplit, hints
     dimsdict = extractdimensions(objectlist, keywordlist, pivot, target)
     someclues = getsomeclues(objectlist, keywordlist, target, dimsdict)
     pathsfrompivot = []
+    # the endpoint of each dimension; several dimensions may share an endpoint,
+    # so fetch the paths to all (distinct) endpoints in one batch
+    dests = {}
+    for k in dimsdict.keys():
+        if keywordlist[k] == '<ot>':
+            dests[k] = objectlist[k]
+        else:
+            dests[k] = objectlist[k].codomain
+    pathstodest = get_graph().get_paths_batch([(pivot, dest) for dest in dests.values() if dest != ignoresplit])
     for k in dimsdict.keys():
         clues = someclues
         obj = objectlist[k]
         if k != dimsdict[k]:
             clues.append(objectlist[dimsdict[k]])
-        if keywordlist[k] == '<ot>':
-            dest = obj
-        else:
-            dest = obj.codomain
+        dest = dests[k]
+        if keywordlist[k] != '<ot>':
             clues.append(obj)
         if dest != ignoresplit:
             hint = []
@@ -70,7 +77,8 @@ def getdimensionpaths(objectlist, keywordlist, pivot, target, ignoresplit, hints
                         hint = hints[k][1:]
                     else:
                         hint = hints[k]
-            path = getoptimalpath(graph.get_paths(pivot, dest), clues, hint)
+            # copy, as the same path may be optimal for another dimension with this endpoint, and paths are changed later
+            path = list(getoptimalpath(pathstodest[(pivot.name, dest.name)], clues, hint))
             pathsfrompivot = insertwithoutpostfixes(path, pathsfrompivot)
             pathsfrompivotdict[k] = path
     return (pathsfrompivot, pathsfrompivotdict)
@@ -123,12 +131,7 @@ def appendvariablestopaths(paths):
     The routine 'appendvariables()' appends these defauts to an individual path.
     Return the list of paths thus obtained.
     """
-    returnpaths = []
-    for path in paths:
-        if path != []:
-            path = appendvariables(path)
-        returnpaths.append(path)
-    return returnpaths
+    return [appendvariables(path) for path in paths]
 
 def appendvariables(path):
     """If path ends with a variable (i.e., if path[0] is a variable), return
@@ -138,12 +141,32 @@ def appendvariables(path):
     """
     if path == []:
         return path
-    elif path[0].__class__.__name__ == 'Variable' or isinstance(path[0], Application):
-        return path
-    else:
-        if path[0].codomain in defaults:
-            path.insert(0, makeproduct(defaults[path[0].codomain]))
+    last = path[0]
+    if type(last) is Variable or isinstance(last, Application):
         return path
+    if last.codomain in defaults:
+        path.insert(0, makeproduct(defaults[last.codomain]))
+    return path
+
+# The patterns that mark the start of a list of dimensions, see extractdimensions()
+_DIMENSIONMARKERS = (['<per>'], ['<prep>', '<all>'], ['<prep>', '<ot>'])
+
+# The keywords that may occur in a list of dimensions, and those among them
+# that are endpoints of a dimension, see extractdimensions()
+_DIMENSIONKEYWORDS = frozenset(['<ot>', '<otr>', '<catvar>', '<all>', '<prep>', '<unk>'])
+_ENDPOINTKEYWORDS = frozenset(['<ot>', '<catvar>', '<otr>'])
+
+def startsdimensions(j, keywordlist):
+    """Return True iff one of the _DIMENSIONMARKERS matches keywordlist at
+    index j (discarding '<unk>'). Only '<per>' and '<prep>' can start such a
+    pattern, so other keywords are rejected right away.
+    """
+    if keywordlist[j] != '<per>' and keywordlist[j] != '<prep>':
+        return False
+    for pattern in _DIMENSIONMARKERS:
+        if match(pattern, 0, j, keywordlist, True) == j:
+            return True
+    return False
 
 def extractdimensions(objectlist, keywordlist, pivot, target):
     """Collect indices to potential dimensions from keywordlist, according to
@@ -163,35 +186,25 @@ def extractdimensions(objectlist, keywordlist, pivot, target):
     dimindices = {}
     i = 0
     while i < len(keywordlist):
-        k = [-1, -1, -1]
-        k[0] = getindexfrompattern(['<per>'], 0, i, keywordlist, True)
-        k[1] = getindexfrompattern(['<prep>','<all>'], 0, i, keywordlist, True)
-        k[2] = getindexfrompattern(['<prep>', '<ot>'], 0, i, keywordlist, True)
-        j = len(keywordlist)
-        for l in k:
-            if l != -1 and l < j:
-                j = l
+        # the first index from i on where one of the _DIMENSIONMARKERS starts
+        j = i
+        while j < len(keywordlist) and not startsdimensions(j, keywordlist):
+            j += 1
         if j < len(keywordlist):
             j += 1
-            while j < len(keywordlist) and (
-                keywordlist[j] == '<ot>' or
-                keywordlist[j] == '<otr>' or
-                keywordlist[j] == '<catvar>' or
-                keywordlist[j] == '<all>' or
-                keywordlist[j] == '<prep>' or ####
-                keywordlist[j] == '<unk>'):
-                if getindexfrompattern(['<ot>', '<prep>', '<otr>'], 0, j, keywordlist, True) == j:
+            while j < len(keywordlist) and keywordlist[j] in _DIMENSIONKEYWORDS:
+                if match(['<ot>', '<prep>', '<otr>'], 0, j, keywordlist, True) == j:
                     dimindices[j] = j + 2
                     j += 2
-                elif getindexfrompattern(['<catvar>', '<prep>', '<otr>'], 0, j, keywordlist, True) == j:
+                elif match(['<catvar>', '<prep>', '<otr>'], 0, j, keywordlist, True) == j:
                     dimindices[j] = j + 2
                     j += 2
-                elif keywordlist[j] == '<ot>' or keywordlist[j] == '<catvar>' or keywordlist[j] == '<otr>':
+                elif keywordlist[j] in _ENDPOINTKEYWORDS:
                     dimindices[j] = j
                 j += 1
         i = j
     # possibly remove some object types. Also correct for selection criteria
-    remove = []
+    remove = set()
     for i in dimindices.keys():
         if keywordlist[i] == '<catvar>':
             obj = objectlist[i].codomain
@@ -202,11 +215,6 @@ def extractdimensions(objectlist, keywordlist, pivot, target):
                 obj = objectlist[i].codomain
         else:
             obj = objectlist[i]
-        if obj.equals(pivot) or obj.equals(target) or graph.get_paths(obj, target) != []:
-            if not i in remove:
-                remove.append(i)
-        k = 0
-    for r in remove:
-        if r in dimindices.keys():
-            dimindices.pop(r)
-    return dimindices
\ No newline at end of file
+        if obj.equals(pivot) or obj.equals(target) or get_graph().has_path(obj, target):
+            remove.add(i)
+    return {i: j for (i, j) in dimindices.items() if not i in remove}
\ No newline at end of file
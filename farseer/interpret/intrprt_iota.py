@@ -20,9 +20,9 @@ finding routines. In the standard case, getiota() does not make use of 'hints'.
 """
 
 from farseer.graphdb.dm import prefvar
-from farseer.interpret.intrprt_base import getoptimalpath, alle, makecomposition, makeproduct, terminlist, getclueindexfrompattern, getcontext, makekappa, makeinclusion
+from farseer.interpret.intrprt_base import getoptimalpath, alle, makecomposition, makecompositions, makeproduct, getclueindexfrompattern, getcontext, getunkindex, makekappa, makeinclusion
 from farseer.interpret.intrprt_dims import appendvariablestopaths
-from farseer.graphdb.graphdb import graph
+from farseer.graphdb.graphdb import get_graph
 
 def getiotapaths(objectlist, keywordlist, pivot, target, hints):
     """Return a dictionary of paths (indexed by indices in objectlist to
@@ -40,10 +40,11 @@ def getiotapaths(objectlist, keywordlist, pivot, target, hints):
     by getiotapaths().
     """
     cluedict = {}
+    unkindex = getunkindex(keywordlist)
     k = 0
     while k < len(keywordlist):
         if keywordlist[k] == '<const>':
-            cluedict[k] = getclues(k, keywordlist)
+            cluedict[k] = getclues(k, keywordlist, unkindex)
         k += 1
     cluesasobjs = getcluesasobjects(cluedict, objectlist, keywordlist)
     paths = getpathstoconstants(cluesasobjs, objectlist, pivot, target, hints)
@@ -65,35 +66,25 @@ def makeiota(paths, objectlist, pivot):
     order in which paths are stored in the dictionary is irrelevant to the
     result.
     """
-    args = []
+    # pairs (arg1, arg2) by the string representation of arg1, so that each
+    # representation is computed once and membership is a dictionary lookup
+    pairs = {}
     for k in paths.keys():
         if paths[k][len(paths[k]) - 1].domain == pivot:
             const = objectlist[k]
             arg1 = makecomposition(paths[k])
             arg2 = makecomposition([const, alle(pivot)])
-            if terminlist(arg1, args):
-                arg2old = args[args.index(arg1) + 1]
-                if arg2.__repr__() > arg2old.__repr__():
-                    args.remove(arg1)
-                    args.remove(arg2old)
-                    args = insertsorted(args, arg1, arg2)
+            key = arg1.__repr__()
+            if key in pairs:
+                if arg2.__repr__() > pairs[key][1].__repr__():
+                    pairs[key] = (arg1, arg2)
             else:
-                args = insertsorted(args, arg1, arg2)
+                pairs[key] = (arg1, arg2)
+    args = []
+    for key in sorted(pairs.keys(), reverse=True):
+        args.extend(pairs[key])
     return makeinclusion(args)
 
-def insertsorted(args, arg1, arg2):
-    """Insert into args the arguments arg1 and arg2 (right after each other),
-    such that the list args remains sorted with respect to the arg1 arguments;
-    these are the arguments with even index in args. As sorting criterium, the
-    string representation of arg1 is used, obtained by the .__repr__() method.
-    """
-    i = 0
-    while i < len(args) and args[i].__repr__() > arg1.__repr__():
-        i += 2
-    args.insert(i, arg1)
-    args.insert(i + 1, arg2)
-    return args
-
 def getpathstoconstants(cluesasobjs, objectlist, pivot, target, hints):
     """Return a dictionary of paths from the pivot to the codomains of the
     constants in objectlist that are indexed by the keys of the cluesasobjs
@@ -108,6 +99,7 @@ def getpathstoconstants(cluesasobjs, objectlist, pivot, target, hints):
     getoptimalpath(), a hint can be given, obtained from the dictionary hints.
     """
     paths = {}
+    searches = {}
     for k in cluesasobjs.keys():
         const = objectlist[k]
         clues = []
@@ -119,14 +111,17 @@ def getpathstoconstants(cluesasobjs, objectlist, pivot, target, hints):
                 clues.append(o)
         if destinationvar == None:
             destinationvar = prefvar[const.codomain]
-        destination = destinationvar.domain
         if pivot != target:
             clues.append(target)
         if k in hints.keys() and hints[k] != []:
             hint = hints[k][1:]
         else:
             hint = []
-        paths[k] = getoptimalpath(graph.get_paths(pivot, destination), clues, hint)
+        searches[k] = (destinationvar, clues, hint)
+    pathsbatch = get_graph().get_paths_batch([(pivot, searches[k][0].domain) for k in searches.keys()])
+    for k in searches.keys():
+        (destinationvar, clues, hint) = searches[k]
+        paths[k] = list(getoptimalpath(pathsbatch[(pivot.name, destinationvar.domain.name)], clues, hint))
         paths[k].insert(0, destinationvar)
     return paths
     
@@ -177,7 +172,7 @@ def getcluesasobjects(cluedict, objectlist, keywordlist):
                     found = True
             if not found:
                 for i in cluedictcleanup.keys():
-                    if objectlist[k].codomain == objectlist[i].codomain or graph.get_paths(objectlist[k].codomain, objectlist[i].codomain) != []:
+                    if objectlist[k].codomain == objectlist[i].codomain or get_graph().has_path(objectlist[k].codomain, objectlist[i].codomain):
                         cluedictcleanup[i].append(k)
         k += 1
     cluesasobjects = {}
@@ -207,7 +202,7 @@ def getclashes(cluedict):
             i += 1
     return clashes
 
-def getclues(k, keywordlist):
+def getclues(k, keywordlist, unkindex=None):
     """Get the context of index k in keywordlist: a list of four indices for
     keywordlist, two right before k and two right after k, to keywords that are
     not equal to '<unk>'. Match this context with a list of patterns and
@@ -217,9 +212,10 @@ def getclues(k, keywordlist):
     occurrences of '<unk>') and if this matches, it returns the index in
     keywordlist to the occurrence of the '<otr>' keyword. The special marker
     '*' indicates the position of k relative to the keywords in the pattern.
+    The context is found using unkindex (see getunkindex()), if given.
     """
     clues = []
-    context = getcontext(k, keywordlist)
+    context = getcontext(k, keywordlist, unkindex)
     clues.append(getclueindexfrompattern(['<otr>', '<prep>', '*'], 0, context, keywordlist))
     clues.append(getclueindexfrompattern(['<prep>', '*', '<otr>'], 2, context, keywordlist))
     clues.append(getclueindexfrompattern(['<catvar>', '*'], 0, context, keywordlist))
@@ -253,9 +249,9 @@ def getkappa(objectlist, keywordlist, pivot, target, iota, paths, split):
             #     clues.append(overridetarget[objectlist[i].codomain])
             i += 1
         if split != None:
-            path = getoptimalpath(graph.get_paths(pivot, split), clues, [])
+            path = getoptimalpath(get_graph().get_paths(pivot, split), clues, [])
             paths.insert(0, path)
-        path = getoptimalpath(graph.get_paths(pivot, target), clues, [])
+        path = getoptimalpath(get_graph().get_paths(pivot, target), clues, [])
         paths.insert(0, path)
     selcsterm = makeselections(paths)
     if selcsterm != None and iota != None:
@@ -272,10 +268,6 @@ def makeselections(paths):
     """From a list of paths originating from a common source, make a product
     of compositions.
     """
-    selcs = []
-    for path in paths:
-        if path != []:
-            arg = makecomposition(path)
-            selcs.append(arg)
+    selcs = makecompositions([path for path in paths if path != []])
     selcsterm = makeproduct(selcs)
     return selcsterm
\ No newline at end of file
@@ -24,7 +24,76 @@ from farseer.interpret.intrprt_base import getindexfrompattern
 from farseer.graphdb.dm import prefvar, orderedobjecttype, overridetarget, interrogativepronouns, orientation
 from farseer.kind.knd import ObjectType, Constant, Variable, ObjectTypeRelation
 from farseer.learn.lrn import gettargetindexfrommodelandtokenizer
-from farseer.graphdb.graphdb import graph
+from farseer.graphdb.graphdb import get_graph
+from functools import lru_cache
+
+# The patterns (with the index of the object sought in each pattern and
+# whether to discard '<unk>') tried in order by getnexttarget()
+_NEXTTARGET_PATTERNS = (
+    (('<whowhat>', '<ot>'), 1, False),
+    (('<ot>', '<with>'), 0, False),
+    (('<const>', '<with>'), 0, False),
+    (('<ot>', '<whowhat>'), 0, False),
+    (('<whowhat>', '<ot>'), 1, True),
+    (('<whowhat>', '<const>', '<ot>'), 2, False),
+    (('<whowhat>', '<const>', '<const>'), 2, False),
+    (('<whowhat>', '<const>'), 1, False),
+    (('<const>', '<ot>'), 1, False),
+    (('<const>', '<const>'), 1, False),
+    (('<ot>',), 0, False),
+    (('<const>',), 0, False))
+
+# The patterns tried in order by getpseudodimension()
+_PSEUDODIMENSION_PATTERNS = (
+    (('<whowhat>', '<ot>'), 1, True),
+    (('<whowhat>', '<const>'), 1, True),
+    (('<most>', '<ot>'), 1, True),
+    (('<greatest>', '<ot>'), 1, True),
+    (('<ot>', '<most>'), 0, True),
+    (('<ot>', '<greatest>'), 0, True),
+    (('<least>', '<ot>'), 1, True),
+    (('<smallest>', '<ot>'), 1, True),
+    (('<ot>', '<least>'), 0, True),
+    (('<ot>', '<smallest>'), 0, True),
+    (('<most>', '<const>'), 1, True),
+    (('<greatest>', '<const>'), 1, True),
+    (('<const>', '<most>'), 0, True),
+    (('<const>', '<greatest>'), 0, True),
+    (('<least>', '<const>'), 1, True),
+    (('<const>', '<least>'), 0, True),
+    (('<smallest>', '<const>'), 1, True),
+    (('<const>', '<smallest>'), 0, True),
+    (('<ot>',), 0, True),
+    (('<const>',), 0, True))
+
+# Size of the caches on the indices matched by the patterns above
+PATTERN_CACHE_SIZE = 1024
+
+def _matchpatterns(patterns, keywords):
+    """Return the indices in keywords matched by patterns, in the order of
+    patterns, leaving out the patterns that do not match.
+    """
+    indices = []
+    for (pattern, patternidx, discardunk) in patterns:
+        p = getindexfrompattern(pattern, patternidx, 0, keywords, discardunk)
+        if p != -1:
+            indices.append(p)
+    return tuple(indices)
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _nexttargetindices(keywords):
+    """The indices matched by getnexttarget() for the tuple keywords. As this
+    depends on the keywords only (and not on the objects), it is cached, and
+    requests with the same keywords are matched just once.
+    """
+    return _matchpatterns(_NEXTTARGET_PATTERNS, keywords)
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _pseudodimensionindices(keywords):
+    """The indices matched by getpseudodimension() for the tuple keywords,
+    cached like _nexttargetindices().
+    """
+    return _matchpatterns(_PSEUDODIMENSION_PATTERNS, keywords)
 
 def getnexttarget(objectlist, keywordlist):
     """Using an ordered sequence of patterns that may or may not match
@@ -41,27 +110,13 @@ def getnexttarget(objectlist, keywordlist):
     be substituted for getnexttarget() and getpseudodimension() will become
     obsolete.
     """
-    possibletargetlist = []
-    possibletargetlist.append(getindexfrompattern(['<whowhat>', '<ot>'], 1, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<ot>', '<with>'], 0, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<const>', '<with>'], 0, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<ot>', '<whowhat>'], 0, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<whowhat>', '<ot>'], 1, 0, keywordlist, True))
-    possibletargetlist.append(getindexfrompattern(['<whowhat>', '<const>', '<ot>'], 2, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<whowhat>', '<const>', '<const>'], 2, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<whowhat>', '<const>'], 1, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<const>', '<ot>'], 1, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<const>', '<const>'], 1, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<ot>'], 0, 0, keywordlist, False))
-    possibletargetlist.append(getindexfrompattern(['<const>'], 0, 0, keywordlist, False))
-    for p in possibletargetlist:
-        if p != -1:
-            obj = objectlist[p]
-            if isinstance(obj, Constant):
-                if obj.codomain in overridetarget.keys():
-                    obj = overridetarget[obj.codomain]
-            if not isinstance(obj, Constant):
-                return obj
+    for p in _nexttargetindices(tuple(keywordlist)):
+        obj = objectlist[p]
+        if isinstance(obj, Constant):
+            if obj.codomain in overridetarget.keys():
+                obj = overridetarget[obj.codomain]
+        if not isinstance(obj, Constant):
+            return obj
     return None
 
 def getpivot(objectlist, keywordlist):
@@ -91,7 +146,7 @@ def getpivot(objectlist, keywordlist):
                         candidate = o[0].domain
             else:
                 candidate = None
-            possiblepivot = graph.get_origin(pivot, candidate)
+            possiblepivot = get_graph().get_origin(pivot, candidate)
             if possiblepivot != None:
                 pivot = possiblepivot
     orderedobjecttypelist = []
@@ -180,35 +235,13 @@ def getpseudodimension(objectlist, keywordlist):
     getpseudodimension() in farseer.interpret.intrprt.assembletermforclass6(),
     which is its only use.
     """
-    pseudodimensionlist = []
-    pseudodimensionlist.append(getindexfrompattern(['<whowhat>', '<ot>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<whowhat>', '<const>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<most>', '<ot>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<greatest>', '<ot>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<ot>', '<most>'], 0, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<ot>', '<greatest>'], 0, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<least>', '<ot>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<smallest>', '<ot>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<ot>', '<least>'], 0, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<ot>', '<smallest>'], 0, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<most>', '<const>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<greatest>', '<const>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<const>', '<most>'], 0, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<const>', '<greatest>'], 0, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<least>', '<const>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<const>', '<least>'], 0, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<smallest>', '<const>'], 1, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<const>', '<smallest>'], 0, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<ot>'], 0, 0, keywordlist, True))
-    pseudodimensionlist.append(getindexfrompattern(['<const>'], 0, 0, keywordlist, True))
-    for p in pseudodimensionlist:
-        if p != -1:
-            obj = objectlist[p]
-            if isinstance(obj, Constant):
-                if obj.codomain in overridetarget.keys():
-                    obj = overridetarget[obj.codomain]
-            if not isinstance(obj, Constant):
-                return obj
+    for p in _pseudodimensionindices(tuple(keywordlist)):
+        obj = objectlist[p]
+        if isinstance(obj, Constant):
+            if obj.codomain in overridetarget.keys():
+                obj = overridetarget[obj.codomain]
+        if not isinstance(obj, Constant):
+            return obj
     return None
 
 def converttotarget(objectlist, keywordlist, tokenlist, k, ordered):
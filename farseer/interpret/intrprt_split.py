@@ -28,7 +28,7 @@ in intrprt.assembletermforclass11() it is passed in the list 'nosplits'.
 
 
 from farseer.term.trm import Application
-from farseer.graphdb.graphdb import graph
+from farseer.graphdb.graphdb import get_graph
 
 def getsplit(objectlist, keywordlist, target, paths, nosplits):
     """Return the 'split' of a query as represented by objectlist and
@@ -43,7 +43,7 @@ def getsplit(objectlist, keywordlist, target, paths, nosplits):
         for path in paths:
             for d in path:
                 if not isinstance(d, Application) and d.codomain.equals(p):
-                    if split == None or (graph.get_paths(p, split) != [] and graph.get_paths(target, p) != []):
+                    if split == None or (get_graph().has_path(p, split) and get_graph().has_path(target, p)):
                         split = p
     return split
 
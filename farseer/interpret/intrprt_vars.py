@@ -5,18 +5,18 @@ Created on Wed Mar  6 11:13:43 2019
 
 @author: tgelsema
 
-This package exposes three similar routines, viz. getpathstonumvars(),
-getpathstocatvars() and getpathstoobjecttypes() that return paths from the
-target to all numerical variables, all categorical variables and all object
-types in objectlist, respectively. These are used only once, viz. in the
-beginning of the farseer.interpret.intrprt.interpret() routine, right after
-which these paths are turned into proper compositions (i.e., formulas). The
+This package exposes the getpathstovariables() routine, that returns paths
+from the target to the numerical variables, the categorical variables and/or
+the object types in objectlist, in a single pass over objectlist. It is used
+by the farseer.interpret.intrprt.interpret() routine, after which these paths
+are turned into proper compositions (i.e., formulas). The
 getpathfromvar() routine is used only once, viz in assembletermforclass6(),
 where a path from the domain of a variable to a pseudo dimension is sought.
 """
 
 from farseer.interpret.intrprt_base import insertsorted, getoptimalpath
-from farseer.graphdb.graphdb import graph
+from farseer.graphdb.graphdb import get_graph
+import sys
 
 def getpathfromvar(objectlist, keywordlist, var, dest):
     """Return a path from the domain of var to target, using the
@@ -28,83 +28,46 @@ def getpathfromvar(objectlist, keywordlist, var, dest):
     i = 0
     clues = []
     while i < len(keywordlist):
-        if keywordlist[i] == '<otr>':
+        if keywordlist[i] == _OTR:
             clues.append(objectlist[i])
         i += 1
-    return getoptimalpath(graph.get_paths(var.domain, dest), clues, [])
+    return getoptimalpath(get_graph().get_paths(var.domain, dest), clues, [])
 
-def getpathstonumvars(objectlist, keywordlist, target):
-    """Return paths from target to the domains of all numerical variables that
-    occur in objectlist (pointed at by keywordlist, by the keyword '<numvar>').
-    The getoptimalpath() routine is used to find these paths, and as clues, all
-    object type relations in objectlist are taken. Exclude the numerical
-    variables that have target as domain (since then the path is empty). Append
-    the numerical variable to each path.
-    """
-    paths = []
-    i = 0
-    clues = []
-    while i < len(keywordlist):
-        if keywordlist[i] == '<otr>':
-            clues.append(objectlist[i])
-        i += 1
-    i = 0
-    while i < len(keywordlist):
-        if keywordlist[i] == '<numvar>':
-            if isinstance(objectlist[i], list):
-                var = objectlist[i][0]
-            else:
-                var = objectlist[i]
-            path = []
-            if not var.domain.equals(target):
-                path = getoptimalpath(graph.get_paths(target, var.domain), clues, [])
-            path.insert(0, var)
-            paths = insertsorted(paths, path)
-        i += 1
-    return paths
+# Keywords in keywordlist pointing at numerical variables, categorical variables and object types, see getpathstovariables()
+PATH_KEYWORDS = tuple(map(sys.intern, ('<numvar>', '<catvar>', '<ot>')))
+_OTR = sys.intern('<otr>')
 
-def getpathstocatvars(objectlist, keywordlist, target):
-    """Similar to the getpathstonumvar() routine, but in getpathstocatvars(),
-    paths from target to categorical variables are returned.
+def getpathstovariables(objectlist, keywordlist, pivot, target, keywords=PATH_KEYWORDS):
+    """Return a dictionary with, for each keyword in keywords (a subset of
+    PATH_KEYWORDS), the paths from target to the objects in objectlist pointed
+    at by that keyword. The getoptimalpath() routine is used to find these
+    paths, and as clues, all object type relations in objectlist are taken;
+    these are collected once, and objectlist is passed through once for all
+    keywords. For numerical ('<numvar>') and categorical ('<catvar>')
+    variables, the path leads to the domain of the variable, and the variable
+    is appended to it; the path is empty if target is that domain. For object
+    types ('<ot>'), the object types that equal pivot or target are excluded
+    (since then the path is nonexistent or empty).
     """
-    paths = []
-    i = 0
-    clues = []
-    while i < len(keywordlist):
-        if keywordlist[i] == '<otr>':
-            clues.append(objectlist[i])
-        i += 1
-    i = 0
-    while i < len(keywordlist):
-        if keywordlist[i] == '<catvar>':
-            var = objectlist[i]
+    clues = [objectlist[i] for (i, keyword) in enumerate(keywordlist) if keyword == _OTR]
+    paths = {keyword: [] for keyword in keywords}
+    graph = get_graph()
+    for (keyword, obj) in zip(keywordlist, objectlist):
+        if keyword not in paths:
+            continue
+        if keyword == '<ot>':
+            if not obj.equals(pivot) and not obj.equals(target):
+                path = getoptimalpath(graph.get_paths(target, obj), clues, [])
+                if path != None and path != []:
+                    paths[keyword] = insertsorted(paths[keyword], path)
+        else:
+            if keyword == '<numvar>' and isinstance(obj, list):
+                var = obj[0]
+            else:
+                var = obj
             path = []
             if not var.domain.equals(target):
                 path = getoptimalpath(graph.get_paths(target, var.domain), clues, [])
             path.insert(0, var)
-            paths = insertsorted(paths, path)
-        i += 1
+            paths[keyword] = insertsorted(paths[keyword], path)
     return paths
-
-def getpathstoobjecttypes(objectlist, keywordlist, pivot, target):
-    """Similar to the getpathstocatvars() and getpathstonumvars() routines, but
-    getpathstoobjecttypes() returns paths from target to all object types in
-    objectlist. Obviously, paths from target to the pivot are excluded (since
-    nonexistent or empty).
-    """
-    paths = []
-    i = 0
-    clues = []
-    while i < len(keywordlist):
-        if keywordlist[i] == '<otr>':
-            clues.append(objectlist[i])
-        i += 1
-    i = 0
-    while i < len(keywordlist):
-        if keywordlist[i] == '<ot>':
-            if not objectlist[i].equals(pivot) and not objectlist[i].equals(target):
-                path = getoptimalpath(graph.get_paths(target, objectlist[i]), clues, [])
-                if path != None and path != []:
-                    paths = insertsorted(paths, path)
-        i += 1
-    return paths
\ No newline at end of file
@@ -134,13 +134,15 @@ from ..term.trm import Term, Application, functional_type, product
 import xml.etree.ElementTree as ET
 import uuid
 import collections
+import sys
 
 class Kind(Term):
     """Abstract class for Types and Elements, itself derived from the Term
     class.
 
     Attributes:
-        name (str):    the name of a Kind instance
+        name (str):    the name of a Kind instance, interned (see sys.intern)
+                       so that equal names are the same string object
         altname (str): an alternative name, e.g., a plural form
         article (str): either 'de' or 'het'
         kind (str):    equals either 'element' or 'type'
@@ -154,6 +156,9 @@ class Kind(Term):
                        instance is elementary (e.g., an elementary 'object
                        type')
         id (str):      a UUID for a Kind instance
+        dbsort (str):  class level attribute: the name of the class of a Kind
+                       instance (like 'ObjectType' or 'Variable'), used as sort
+                       in the graph database
         uses (dict):   an ordered dictionary of (id (str), kind (Kind)) pairs
                        a Kind instance uses. Note that the uses dictionary can
                        be manually filled by calling the appenduse() member
@@ -181,6 +186,8 @@ class Kind(Term):
         arguments.
 
         """
+        if isinstance(name, str):
+            name = sys.intern(name)
         self.name = name
         self.info = info
         self.constr = constr
@@ -193,6 +200,15 @@ class Kind(Term):
         self.altname = altname
         self.article = article
 
+    def __init_subclass__(cls, **kwargs):
+        """Record the name of every class derived from Kind as its dbsort
+        class attribute, so that it need not be looked up on the type of an
+        instance.
+
+        """
+        super().__init_subclass__(**kwargs)
+        cls.dbsort = cls.__name__
+
     def appenduse(self, kind):
         """Add a Kind instance to the uses dictionary, if not already present.
 
@@ -8,6 +8,7 @@ Created on Fri Jun 29 11:51:36 2018
 __package__ = 'farseer.nlp'
 
 import re
+import sys
 from farseer.kind.knd import Constant
 from farseer.domainmodel.dm import vocab
 # from _jellyfish import damerau_levenshtein_distance
@@ -20,7 +21,7 @@ import pandas as pd
 from sklearn.metrics.pairwise import cosine_similarity
 
 from farseer.nlp.tokenizer import tokenizer
-from farseer.graphdb.graphdb import graph
+from farseer.graphdb.graphdb import get_graph
 
 
 vectors_filename = 'wiki.nl.vec' # file with word vectors from a corpus: the full corpus of Dutch wiki pages
@@ -263,9 +264,11 @@ def getkeywordlist(tokenlist, objectlist):
 
 def tokenize(s):
     tokens, object_names, keywords = tokenizer(s.lower())
-    objects = [graph.get_kind(object_name) for object_name in object_names]
+    objects = [get_graph().get_kind(object_name) for object_name in object_names]
     objects, synonyms = named_entity_recognition(tokens, objects)
     keywords = add_synonym_keywords(objects, synonyms, keywords)
+    # intern the keywords, so that comparing them with (interned) keyword constants is a pointer compare
+    keywords = [sys.intern(keyword) for keyword in keywords]
     return tokens, synonyms, objects, keywords
 
 def add_synonym_keywords(objects, synonyms, keywords):
@@ -336,7 +339,7 @@ def named_entity_recognition(tokenlist, objectlist):
         if objectlist[i] == None and not tokenlist[i] in stopwords and not tokenlist[i] in vocab:
             synonym = maximum_similarity(tokenlist[i])
             if synonym in lookup.keys():
-                objectlist[i] = graph.get_kind(lookup[synonym][0], lookup[synonym][1])
+                objectlist[i] = get_graph().get_kind(lookup[synonym][0], lookup[synonym][1])
             if synonym in vocab:
                 synonymlist[i] = synonym
         i += 1